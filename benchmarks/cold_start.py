@@ -0,0 +1,103 @@
+"""Cold-start benchmark for app.py.
+
+Each run starts a fresh interpreter with ``python -X importtime``, renders the
+app once headlessly with ``streamlit.testing.v1.AppTest`` and exits. The wall
+time from spawning the interpreter to the end of that first render is reported
+as time-to-first-render, together with the slowest imports and which heavy
+libraries got loaded. The script exits with status 1 when the median
+time-to-first-render is over ``--budget`` seconds, so it can gate CI.
+
+    python benchmarks/cold_start.py --runs 5 --budget 4
+    python benchmarks/cold_start.py --section de  # a tab with a chart
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+APP_PATH = Path(__file__).resolve().parent.parent / "app.py"
+
+HEAVY_MODULES = ["pandas", "altair", "numpy", "pyarrow", "matplotlib", "scipy", "seaborn"]
+
+RENDER_SNIPPET = """
+import json, sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=60)
+if {section!r} is not None:
+    at.query_params["section"] = {section!r}
+at.run()
+if at.exception:
+    sys.exit("app.py raised: " + at.exception[0].message)
+print(json.dumps([m for m in {heavy!r} if m in sys.modules]))
+"""
+
+
+def parse_importtime(stderr):
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith(" ") or name.startswith("  "):
+            continue  # only top-level imports, nested ones are counted in their parent
+        imports.append((name.strip(), int(cumulative) / 1e6))
+    return sorted(imports, key=lambda item: item[1], reverse=True)
+
+
+def cold_start(section=None):
+    code = RENDER_SNIPPET.format(app=str(APP_PATH), section=section, heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, cwd=APP_PATH.parent)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"cold start failed:\n{proc.stderr[-2000:]}")
+    loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+    return elapsed, parse_importtime(proc.stderr), loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold-start time-to-first-render of app.py.")
+    parser.add_argument("--runs", type=int, default=3, help="number of cold starts to time (default: 3)")
+    parser.add_argument("--budget", type=float, default=5.0,
+                        help="fail if the median time-to-first-render is over this many seconds (default: 5)")
+    parser.add_argument("--section", default=None, help="slug of the tab to open first, e.g. de")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest imports to list (default: 10)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    timings = []
+    for _ in range(args.runs):
+        elapsed, imports, loaded = cold_start(args.section)
+        timings.append(elapsed)
+    median = statistics.median(timings)
+
+    result = {
+        "section": args.section,
+        "runs": timings,
+        "median_seconds": median,
+        "budget_seconds": args.budget,
+        "heavy_modules_loaded": loaded,
+        "slowest_imports": [{"module": name, "seconds": seconds} for name, seconds in imports[:args.top]],
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"time-to-first-render: median {median:.2f}s over {args.runs} runs (budget {args.budget:.2f}s)")
+        print(f"heavy modules loaded: {', '.join(loaded) or 'none'}")
+        print("slowest top-level imports:")
+        for name, seconds in imports[:args.top]:
+            print(f"  {seconds:7.3f}s  {name}")
+
+    if median > args.budget:
+        print(f"FAIL: median time-to-first-render {median:.2f}s is over the {args.budget:.2f}s budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
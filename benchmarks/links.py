@@ -0,0 +1,96 @@
+"""Offline benchmark of the link checker against a local stub server.
+
+Checks ``--links`` URLs spread over two host names of the stub server
+(``127.0.0.1`` and ``localhost``), first with an empty cache and then again
+with the cache warm, and verifies that:
+
+- every link gets the status the stub server gives it (200, 404, redirect, HEAD
+  not allowed);
+- no host ever had more than ``--per-host`` requests in flight;
+- the warm run makes no requests at all.
+
+    python benchmarks/links.py --links 200 --per-host 4
+
+Exits with 1 if any of these fails.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from derelict.links import check_links  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+# Route on the stub server, and whether links to it should come back as ok.
+ROUTES = {"ok": True, "slow": True, "redirect": True, "no-head": True, "missing": False}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the link checker against a local stub server.")
+    parser.add_argument("--links", type=int, default=100, help="number of links to check (default: 100)")
+    parser.add_argument("--jobs", type=int, default=16, help="requests in flight at once (default: 16)")
+    parser.add_argument("--per-host", type=int, default=4, help="requests in flight to one host at once (default: 4)")
+    parser.add_argument("--interval", type=float, default=0.0,
+                        help="seconds between starting requests to the same host (default: 0)")
+    parser.add_argument("--delay", type=float, default=0.05, help="seconds the stub's /slow/ pages take (default: 0.05)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    # The stub is local; never send its requests through a proxy.
+    os.environ["no_proxy"] = os.environ["NO_PROXY"] = "127.0.0.1,localhost"
+    routes = list(ROUTES)
+    failures = []
+    with StubServer(delay=args.delay) as server, tempfile.TemporaryDirectory() as tmp:
+        urls = [server.url(f"{routes[i % len(routes)]}/page-{i}", host=("127.0.0.1", "localhost")[i % 2])
+                for i in range(args.links)]
+        cache = os.path.join(tmp, "links.json")
+        options = {"cache_path": cache, "jobs": args.jobs, "per_host": args.per_host, "interval": args.interval, "timeout": 5}
+
+        start = time.perf_counter()
+        cold = check_links(urls, **options)
+        cold_seconds = time.perf_counter() - start
+        cold_requests = server.requests
+
+        start = time.perf_counter()
+        warm = check_links(urls, **options)
+        warm_seconds = time.perf_counter() - start
+        warm_requests = server.requests - cold_requests
+
+        for result in cold:
+            expected = ROUTES[result["url"].split("/")[3]]
+            if result["ok"] != expected:
+                failures.append(f"{result['url']}: expected {'ok' if expected else 'broken'}, got {result['status'] or result['error']}")
+        for host, most in server.max_in_flight.items():
+            if most > args.per_host:
+                failures.append(f"{host} had {most} requests in flight, more than --per-host {args.per_host}")
+        if warm_requests or not all(result["cached"] for result in warm):
+            failures.append(f"the warm run made {warm_requests} requests instead of using the cache")
+
+    results = {
+        "links": args.links,
+        "cold_seconds": round(cold_seconds, 3),
+        "cold_requests": cold_requests,
+        "warm_seconds": round(warm_seconds, 3),
+        "warm_requests": warm_requests,
+        "max_in_flight_per_host": server.max_in_flight,
+        "failures": failures,
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"cold: {args.links} links in {cold_seconds:.2f}s ({cold_requests} requests)")
+        print(f"warm: {args.links} links in {warm_seconds:.3f}s ({warm_requests} requests)")
+        print("most requests in flight per host: " + ", ".join(f"{host} {most}" for host, most in server.max_in_flight.items()))
+        for failure in failures:
+            print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""Headless rerun benchmarks for app.py, built on streamlit.testing.v1.AppTest.
+
+Measures, for every tab:
+
+- script rerun latency (a first run for a new session, then ``--reruns`` warm reruns);
+- the element count and protobuf payload of each ``st.popover``, whether
+  opening it costs a rerun and, for each keyed popover, how long a rerun with it
+  open takes (the live app only reruns the popover's fragment, AppTest always
+  reruns the whole script, so this is an upper bound);
+- the Python memory a new session still holds after rendering the tab, as the
+  difference between tracemalloc snapshots taken before and after, in a
+  session of its own so tracing doesn't slow down the timed runs (after a
+  warm-up render of every tab, so that imports and ``st.cache_data`` entries,
+  which all sessions share, aren't counted);
+
+and the throughput of ``--sessions`` simulated sessions rerunning at the same
+time in a thread pool. Results are written as JSON (and optionally CSV) with
+the current git commit, so runs can be compared between commits:
+
+    python benchmarks/reruns.py --out bench.json --csv bench.csv
+"""
+import argparse
+import csv
+import gc
+import json
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from derelict.sections import SECTIONS  # noqa: E402
+
+APP_PATH = ROOT / "app.py"
+
+
+def new_session(section):
+    at = AppTest.from_file(str(APP_PATH), default_timeout=60)
+    at.query_params["section"] = section
+    return at
+
+
+def run(at):
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"app.py raised: {at.exception[0].message}")
+    return elapsed
+
+
+def walk(node):
+    yield node
+    for child in getattr(node, "children", {}).values():
+        yield from walk(child)
+
+
+def payload_bytes(node):
+    return sum(n.proto.ByteSize() for n in walk(node) if getattr(n, "proto", None) is not None)
+
+
+def find_popover(at, widget_id):
+    return next(node for node in walk(at._tree.children[0])
+                if getattr(node, "type", None) == "popover" and node.proto.popover.id == widget_id)
+
+
+def popovers(at):
+    found = []
+    for node in walk(at._tree.children[0]):
+        if getattr(node, "type", None) != "popover":
+            continue
+        found.append({
+            "label": node.proto.popover.label,
+            "elements": sum(1 for _ in walk(node)) - 1,
+            "payload_bytes": payload_bytes(node) - node.proto.ByteSize(),
+            # Popovers that track state (on_change="rerun" or a callback) get a
+            # widget id; the others open in the browser without a rerun.
+            "opens_with_rerun": bool(node.proto.popover.id),
+            "widget_id": node.proto.popover.id or None,
+        })
+    for popover in found:
+        # Widget ids end with the key the popover was given, which is what
+        # AppTest's session state is set by.
+        key = popover["widget_id"].split("-", 2)[-1] if popover["widget_id"] else "None"
+        if key == "None":
+            continue
+        at.session_state[key] = True
+        popover["open_seconds"] = run(at)
+        if not find_popover(at, popover["widget_id"]).proto.popover.open:
+            raise RuntimeError(f"setting {key!r} didn't open the popover")
+        at.session_state[key] = False
+        popover["close_seconds"] = run(at)
+    return found
+
+
+def warm_up():
+    for section in SECTIONS:
+        run(new_session(section["slug"]))
+
+
+def session_memory(section):
+    """Python memory a new session still holds after rendering ``section`` once, from tracemalloc snapshots."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    at = new_session(section)
+    run(at)
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del at
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+
+def bench_section(section, reruns):
+    # Timed in a session of its own: tracing allocations slows a run down several times.
+    at = new_session(section)
+    first = run(at)
+    warm = [run(at) for _ in range(reruns)]
+    return {
+        "section": section,
+        "first_run_seconds": first,
+        "rerun_median_seconds": statistics.median(warm),
+        "rerun_max_seconds": max(warm),
+        "payload_bytes": payload_bytes(at._tree.children[0]),
+        "session_memory_bytes": session_memory(section),
+        "popovers": popovers(at),
+    }
+
+
+def bench_concurrency(sessions, reruns):
+    # Every simulated session opens a different tab in turn, then reruns it.
+    apps = [new_session(SECTIONS[i % len(SECTIONS)]["slug"]) for i in range(sessions)]
+    for at in apps:
+        run(at)
+
+    def rerun_session(at):
+        return [run(at) for _ in range(reruns)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        latencies = [t for result in pool.map(rerun_session, apps) for t in result]
+    elapsed = time.perf_counter() - start
+    return {
+        "sessions": sessions,
+        "reruns_per_session": reruns,
+        "wall_seconds": elapsed,
+        "reruns_per_second": len(latencies) / elapsed,
+        "rerun_median_seconds": statistics.median(latencies),
+        "rerun_max_seconds": max(latencies),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=ROOT, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_csv(path, results):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["commit", "benchmark", "section", "metric", "value"])
+        for row in results["sections"]:
+            for metric in ("first_run_seconds", "rerun_median_seconds", "rerun_max_seconds",
+                           "payload_bytes", "session_memory_bytes"):
+                writer.writerow([results["commit"], "section", row["section"], metric, row[metric]])
+            for popover in row["popovers"]:
+                for metric in ("payload_bytes", "open_seconds", "close_seconds"):
+                    if metric in popover:
+                        writer.writerow([results["commit"], "popover", row["section"], metric, popover[metric]])
+        for metric, value in results["concurrency"].items():
+            writer.writerow([results["commit"], "concurrency", "", metric, value])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark app.py reruns headlessly with AppTest.")
+    parser.add_argument("--reruns", type=int, default=10, help="warm reruns to time per tab (default: 10)")
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent simulated sessions (default: 8)")
+    parser.add_argument("--out", default="bench_reruns.json", help="JSON results file (default: bench_reruns.json)")
+    parser.add_argument("--csv", default=None, help="also write the results as CSV to this file")
+    args = parser.parse_args(argv)
+
+    warm_up()
+    results = {
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "sections": [bench_section(section["slug"], args.reruns) for section in SECTIONS],
+        "concurrency": bench_concurrency(args.sessions, args.reruns),
+    }
+
+    Path(args.out).write_text(json.dumps(results, indent=2))
+    if args.csv:
+        write_csv(args.csv, results)
+
+    for row in results["sections"]:
+        print(f"{row['section']:>5}: first run {row['first_run_seconds'] * 1000:7.1f} ms, "
+              f"rerun {row['rerun_median_seconds'] * 1000:6.1f} ms, payload {row['payload_bytes']:6d} B, "
+              f"session memory {row['session_memory_bytes'] / 1e3:7.1f} kB, popovers {len(row['popovers'])}")
+    concurrency = results["concurrency"]
+    print(f"{concurrency['sessions']} concurrent sessions: {concurrency['reruns_per_second']:.1f} reruns/s, "
+          f"median rerun {concurrency['rerun_median_seconds'] * 1000:.1f} ms")
+    print(f"wrote {args.out}" + (f" and {args.csv}" if args.csv else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
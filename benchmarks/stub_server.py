@@ -0,0 +1,87 @@
+"""A local HTTP server with canned responses, so the link checker can run offline.
+
+Paths are matched by their first segment:
+
+- ``/ok/...`` answers 200;
+- ``/missing/...`` answers 404;
+- ``/redirect/...`` redirects to the same path under ``/ok/``;
+- ``/no-head/...`` answers 405 to HEAD and 200 to GET;
+- ``/slow/...`` answers 200 after ``delay`` seconds.
+
+The server counts requests and records the most requests it had in flight at
+once for each ``Host`` header, so rate limiting can be checked.
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self._respond(head=True)
+
+    def do_GET(self):
+        self._respond(head=False)
+
+    def _respond(self, head):
+        stub = self.server.stub
+        host = self.headers.get("Host", "")
+        route = self.path.strip("/").split("/", 1)[0]
+        stub.started(host)
+        # Counted as in flight until the response is ready, not until it is sent,
+        # so a client following a redirect isn't counted twice.
+        try:
+            if route == "slow":
+                time.sleep(stub.delay)
+        finally:
+            stub.finished(host)
+        if route in ("ok", "slow") or (route == "no-head" and not head):
+            self.send_response(200)
+        elif route == "no-head":
+            self.send_response(405)
+        elif route == "redirect":
+            self.send_response(301)
+            self.send_header("Location", "/ok/" + self.path.strip("/").split("/", 1)[-1])
+        else:
+            self.send_response(404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class StubServer:
+    """``with StubServer() as server: server.url("ok/page")``"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.requests = 0
+        self.in_flight = {}
+        self.max_in_flight = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def url(self, path, host="127.0.0.1"):
+        return f"http://{host}:{self._server.server_port}/{path.lstrip('/')}"
+
+    def started(self, host):
+        with self._lock:
+            self.requests += 1
+            self.in_flight[host] = self.in_flight.get(host, 0) + 1
+            self.max_in_flight[host] = max(self.max_in_flight.get(host, 0), self.in_flight[host])
+
+    def finished(self, host):
+        with self._lock:
+            self.in_flight[host] -= 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
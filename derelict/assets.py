@@ -0,0 +1,98 @@
+"""The app's stylesheet, served as a static file.
+
+``derelict/data/derelict.css`` is copied to ``static/derelict-<hash>.css``,
+where Streamlit serves it at ``app/static/`` (``server.enableStaticServing``).
+The content hash in the name means the file at a given URL never changes, so
+browsers and any proxy or CDN in front of the app can cache it for good
+(Streamlit itself only sends an ETag; set ``Cache-Control: public, max-age=31536000,
+immutable`` for ``/app/static/derelict-*`` in the proxy to skip revalidation).
+
+Each session adds a ``<link>`` to the stylesheet to the page once, instead of
+every rerun re-sending the CSS inline. Rebuild after editing the CSS:
+
+    python -m derelict.assets --build
+    python -m derelict.assets --check
+"""
+import argparse
+import functools
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import streamlit as st
+
+SOURCE = Path(__file__).resolve().parent / "data" / "derelict.css"
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+URL_PREFIX = "app/static/"
+
+
+@functools.lru_cache(maxsize=None)
+def stylesheet():
+    """``(file name, CSS)`` of the current stylesheet, read once per process."""
+    css = SOURCE.read_text(encoding="utf-8")
+    digest = hashlib.sha256(css.encode("utf-8")).hexdigest()[:12]
+    return f"derelict-{digest}.css", css
+
+
+def inject_stylesheet():
+    """Link the stylesheet into the page, once per session."""
+    name, css = stylesheet()
+    if not (STATIC_DIR / name).exists():
+        # Not built for this version of the CSS: fall back to sending it inline
+        # on every run, so the app still looks right.
+        st.html(f"<style>{css}</style>")
+        return
+    if "stylesheet_linked" in st.session_state:
+        return
+    st.session_state.stylesheet_linked = True
+    # The <link> goes into the page's <head>, so it stays after this element is
+    # cleared on the next rerun.
+    st.html(f"""
+    <script>
+    let link = document.getElementById("derelict-stylesheet");
+    if (!link) {{
+        link = document.createElement("link");
+        link.id = "derelict-stylesheet";
+        link.rel = "stylesheet";
+        document.head.appendChild(link);
+    }}
+    link.href = {json.dumps(URL_PREFIX + name)};
+    </script>
+    """, unsafe_allow_javascript=True)
+
+
+def build():
+    """Write the hashed stylesheet to ``static/`` and remove older builds of it."""
+    name, css = stylesheet()
+    STATIC_DIR.mkdir(exist_ok=True)
+    for old in STATIC_DIR.glob("derelict-*.css"):
+        if old.name != name:
+            old.unlink()
+    (STATIC_DIR / name).write_text(css, encoding="utf-8")
+    return STATIC_DIR / name
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the app's hashed static stylesheet.")
+    parser.add_argument("--build", action="store_true", help=f"write the stylesheet to {STATIC_DIR.name}/")
+    parser.add_argument("--check", action="store_true", help="fail if the built stylesheet is missing or out of date")
+    args = parser.parse_args(argv)
+
+    name, css = stylesheet()
+    target = STATIC_DIR / name
+    if args.check:
+        stale = [old.name for old in STATIC_DIR.glob("derelict-*.css") if old.name != name]
+        if not target.exists() or target.read_text(encoding="utf-8") != css or stale:
+            print(f"{target} is out of date with {SOURCE.name}, re-run `python -m derelict.assets --build`", file=sys.stderr)
+            return 1
+        print(f"{target} matches {SOURCE.name}")
+        return 0
+    if args.build:
+        print(f"wrote {build()}")
+        return 0
+    parser.error("give --build or --check")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
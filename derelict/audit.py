@@ -0,0 +1,214 @@
+"""Check a project for the DeReLiCT items: Dependencies, Repository, License,
+Citation and Testing.
+
+The checks only need the list of paths in the project plus the contents of a
+handful of small candidate files, so a zipped repository is audited straight
+from the zip's central directory: nothing is extracted to disk, files that are
+not candidates (data, images, binaries...) are never decompressed, and
+candidates larger than ``MAX_CANDIDATE_BYTES`` are only listed, not read.
+Candidate files are read in parallel. Local checkouts are audited the same
+way with ``audit_directory``, without descending into ``.git``.
+"""
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
+from pathlib import PurePosixPath
+
+from derelict.licenses import identify
+
+# Candidate files bigger than this are reported but not read.
+MAX_CANDIDATE_BYTES = 1024 * 1024
+
+# Below this estimated similarity a LICENSE file is reported as unrecognised.
+LICENSE_MATCH_THRESHOLD = 0.5
+
+DEPENDENCY_FILES = [
+    "requirements*.txt", "env.yml", "env.yaml", "environment.yml", "environment.yaml",
+    "pyproject.toml", "setup.py", "setup.cfg", "Pipfile", "Pipfile.lock", "poetry.lock",
+    "renv.lock", "DESCRIPTION", "Project.toml",
+]
+LICENSE_FILES = ["LICENSE", "LICENSE.*", "LICENCE", "LICENCE.*", "COPYING", "COPYING.*"]
+CITATION_FILES = ["CITATION.cff", "CITATION", "CITATION.*"]
+CI_FILES = [
+    ".github/workflows/*.yml", ".github/workflows/*.yaml", ".gitlab-ci.yml", ".travis.yml",
+    "azure-pipelines.yml", ".circleci/config.yml", "Jenkinsfile",
+]
+TEST_DIRS = {"test", "tests", "testing"}
+TEST_FILES = ["test_*.py", "*_test.py", "test-*.R", "test_*.R"]
+
+
+def _matches(path, patterns):
+    return any(fnmatch(path, pattern) for pattern in patterns)
+
+
+def _top_level(path):
+    return "/" not in path
+
+
+def strip_common_root(paths):
+    """Drop the single top-level folder GitHub and most tools wrap archives in."""
+    roots = {path.split("/", 1)[0] for path in paths}
+    if len(roots) == 1 and any("/" in path for path in paths):
+        prefix = roots.pop() + "/"
+        return {path: path[len(prefix):] if path.startswith(prefix) else "" for path in paths}
+    return {path: path for path in paths}
+
+
+def _classify(paths):
+    """Sort project-relative paths into the DeReLiCT items, by name only."""
+    found = {"Dependencies": [], "Repository": [], "License": [], "Citation": [], "Testing": []}
+    for path in paths:
+        name = PurePosixPath(path).name
+        parts = PurePosixPath(path).parts
+        if _top_level(path) and _matches(name, DEPENDENCY_FILES):
+            found["Dependencies"].append(path)
+        elif _top_level(path) and _matches(name, LICENSE_FILES):
+            found["License"].append(path)
+        elif _top_level(path) and _matches(name, CITATION_FILES):
+            found["Citation"].append(path)
+        elif path in (".git/HEAD", ".git/config", ".git"):
+            found["Repository"].append(path)
+        elif _matches(path, CI_FILES):
+            found["Testing"].append(path)
+        elif any(part in TEST_DIRS for part in parts[:-1]) or _matches(name, TEST_FILES):
+            found["Testing"].append(path)
+    return found
+
+
+def _test_location(path):
+    if _matches(path, CI_FILES):
+        return path
+    parts = PurePosixPath(path).parts
+    for i, part in enumerate(parts[:-1]):
+        if part in TEST_DIRS:
+            return "/".join(parts[:i + 1]) + "/"
+    return path
+
+
+def _describe(path, text):
+    """Short notes on the contents of a candidate file."""
+    name = PurePosixPath(path).name
+    if text is None:
+        return [f"`{path}` is larger than {MAX_CANDIDATE_BYTES // 1024} kB, not read"]
+    if fnmatch(name, "requirements*.txt"):
+        entries = [line for line in text.splitlines() if line.strip() and not line.lstrip().startswith(("#", "-"))]
+        return [f"`{path}` lists {len(entries)} packages"]
+    if name == "pyproject.toml":
+        if re.search(r"^\s*dependencies\s*=", text, re.MULTILINE):
+            return [f"`{path}` declares dependencies"]
+        return [f"`{path}` has no `dependencies` entry"]
+    if name.endswith((".yml", ".yaml")) and not path.startswith("."):
+        if re.search(r"^dependencies\s*:", text, re.MULTILINE):
+            return [f"`{path}` is a conda environment file"]
+        return []
+    if name == "CITATION.cff":
+        if "cff-version" not in text:
+            return [f"`{path}` has no `cff-version`, it may not be a valid Citation File Format file"]
+        return [f"`{path}` is a Citation File Format file"]
+    if _matches(name, LICENSE_FILES):
+        if not text.strip():
+            return [f"`{path}` is empty"]
+        best = identify(text, top=1)[0]
+        if best["similarity"] < LICENSE_MATCH_THRESHOLD:
+            return [f"`{path}` doesn't closely match any SPDX license"]
+        return [f"`{path}` looks like the {best['name']} (`{best['id']}`, {best['similarity']:.0%} similar)"]
+    return []
+
+
+def _needs_reading(path):
+    name = PurePosixPath(path).name
+    return _top_level(path) and (
+        fnmatch(name, "requirements*.txt") or name in ("pyproject.toml", "CITATION.cff")
+        or name.endswith((".yml", ".yaml")) or _matches(name, LICENSE_FILES)
+    )
+
+
+def audit_files(paths, read, workers=8):
+    """Audit a project given its relative ``paths`` and a ``read(path)`` function.
+
+    ``read`` returns the decoded text of a file, or ``None`` if the file is too
+    large to read. Returns a list of ``{"item", "found", "files", "notes"}``
+    dicts in DeReLiCT order.
+    """
+    found = _classify(paths)
+    candidates = [path for files in found.values() for path in files if _needs_reading(path)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        notes = dict(zip(candidates, pool.map(lambda path: _describe(path, read(path)), candidates)))
+
+    report = []
+    for item, files in found.items():
+        if item == "Testing":
+            # Only list the test directories and CI configs, not every test file.
+            shown = sorted({_test_location(path) for path in files})
+        elif item == "Repository":
+            shown = [".git"] if files else []
+        else:
+            shown = sorted(files)
+        report.append({
+            "item": item,
+            "found": bool(files),
+            "files": shown,
+            "notes": [note for path in sorted(files) for note in notes.get(path, [])],
+        })
+    return report
+
+
+def _decode(data):
+    return data.decode("utf-8", errors="replace")
+
+
+def audit_zip(file):
+    """Audit a zipped repository from a path or a seekable binary file object.
+
+    Many zips of a repository leave out its ``.git`` folder (GitHub's
+    "Download ZIP" always does), so a missing ``.git`` doesn't show the
+    project has no version control: the Repository check then has ``found``
+    set to ``None``, for "can't tell", instead of ``False``.
+    """
+    with zipfile.ZipFile(file) as archive:
+        infos = {info.filename: info for info in archive.infolist()}
+        relative = strip_common_root([name.rstrip("/") for name in infos])
+        by_relative = {relative[name.rstrip("/")]: info for name, info in infos.items()}
+
+        def read(path):
+            info = by_relative[path]
+            if info.file_size > MAX_CANDIDATE_BYTES:
+                return None
+            with archive.open(info) as f:
+                return _decode(f.read(MAX_CANDIDATE_BYTES))
+
+        report = audit_files([path for path in by_relative if path], read)
+    for check in report:
+        if check["item"] == "Repository" and not check["found"]:
+            check["found"] = None
+            check["notes"].append("The zip has no `.git` folder, so whether the project is under version control "
+                                  "can't be told from it.")
+    return report
+
+
+# Directories that never hold DeReLiCT files and can be very large.
+SKIP_DIRS = {".git", "node_modules", "__pycache__", ".tox", ".nox", ".venv", "venv", ".mypy_cache", ".pytest_cache"}
+
+
+def audit_directory(root):
+    """Audit a project checked out in the local directory ``root``."""
+    root = os.path.abspath(root)
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        relative = os.path.relpath(dirpath, root).replace(os.sep, "/")
+        prefix = "" if relative == "." else relative + "/"
+        if not prefix and ".git" in dirnames:
+            paths.append(".git")
+        dirnames[:] = [name for name in dirnames if name not in SKIP_DIRS]
+        paths.extend(prefix + name for name in filenames)
+
+    def read(path):
+        full = os.path.join(root, *path.split("/"))
+        if os.path.getsize(full) > MAX_CANDIDATE_BYTES:
+            return None
+        with open(full, "rb") as f:
+            return _decode(f.read(MAX_CANDIDATE_BYTES))
+
+    return audit_files(paths, read)
@@ -0,0 +1,100 @@
+import streamlit as st
+
+from derelict import metrics, surveys
+
+# pandas and altair are only imported when a chart is first built (see below),
+# so tabs without charts and cold starts don't pay for importing them.
+
+# Every survey chart the guide can show, looked up by name so the cached
+# functions below only ever hash a few short values. The data comes from
+# derelict.surveys.
+SURVEY_CHARTS = {
+    "where_dependencies": {
+        "title": "What format is your application dependency information stored in?",
+    },
+    "tools_for_dependencies": {
+        "title": "Which tools do you use for application dependency management?",
+    },
+    "vc_tools": {
+        "title": "What version control system do you use?",
+    },
+}
+
+
+def percentage_dataframe(percentages):
+    import pandas as pd
+    return pd.DataFrame.from_dict(percentages, orient='index', columns=["Percentage"]).sort_values("Percentage").reset_index()
+
+
+def survey_bar_chart(df, title):
+    """Horizontal bar chart of the "Percentage" column of a survey dataframe."""
+    import altair as alt
+    return alt.Chart(df).mark_bar(
+        size=40,
+        cornerRadiusBottomRight=3,
+        cornerRadiusTopRight=3
+    ).encode(
+        y=alt.Y('index').sort('-x'),
+        x='Percentage',
+        color=alt.Color("Percentage", legend=None).scale(scheme="bluepurple")
+    ).properties(
+        height=alt.Step(50),
+        title=title
+    ).configure_axis(
+        labelFontSize=16,
+        titleFontSize=16
+    ).configure_axisY(labelAlign="right", labelLimit=300, title=None).configure_title(
+        fontSize=16, color="gray")
+
+
+# The dataframes and compiled Vega-Lite specs never change while the app is
+# running, so they are built once per process and every session gets a copy of
+# the same cached spec instead of redoing the pandas and Altair work on rerun.
+@st.cache_data(show_spinner=False)
+def survey_options(name):
+    return surveys.options(name)
+
+
+@st.cache_data(show_spinner=False)
+def survey_dataframe(name, year=None, group=surveys.ALL_RESPONDENTS):
+    return percentage_dataframe(surveys.percentages(name, year, group))
+
+
+@st.cache_data(show_spinner=False)
+def survey_chart_spec(name, year=None, group=surveys.ALL_RESPONDENTS):
+    with metrics.timed("derelict_chart_build_seconds", chart=name):
+        return survey_bar_chart(survey_dataframe(name, year, group), SURVEY_CHARTS[name]["title"]).to_dict()
+
+
+def survey_chart(name):
+    """Show the chart of survey question ``name`` and return the survey year shown."""
+    years, groups = survey_options(name)
+    year, group = years[0], surveys.ALL_RESPONDENTS
+    # Only offer filters once raw survey data for more years or groups has been
+    # ingested; with just the published numbers the chart is shown as is.
+    if len(years) > 1 or len(groups) > 1:
+        year_column, group_column = st.columns(2)
+        year = year_column.selectbox("Survey year", years, key=f"{name}_year")
+        group = group_column.selectbox("Respondents", groups, key=f"{name}_group")
+    if survey_dataframe(name, year, group).empty:
+        st.info(f"There is no {year} survey data for this group of respondents.")
+        return year
+    st.vega_lite_chart(survey_chart_spec(name, year, group), width="stretch")
+    return year
+
+
+def test_durations_chart(slow):
+    """Horizontal bars of the slowest tests, one bar per run, from ``derelict.testreports.slowest``."""
+    import altair as alt
+    return alt.Chart(slow).mark_bar(
+        cornerRadiusBottomRight=3,
+        cornerRadiusTopRight=3
+    ).encode(
+        y=alt.Y("test", title=None).sort("-x"),
+        x=alt.X("seconds", title="Seconds"),
+        yOffset="run",
+        color=alt.Color("run", title="Run").scale(scheme="bluepurple"),
+        tooltip=["run", "test", alt.Tooltip("seconds", format=".2f")],
+    ).properties(
+        height=alt.Step(20)
+    ).configure_axisY(labelAlign="right", labelLimit=400)
@@ -0,0 +1,314 @@
+"""Draft a ``CITATION.cff`` from a git repository.
+
+Authors come from the commit history (most commits first), the version and
+release date from the latest tag reachable from HEAD, and the license from the
+LICENSE file at HEAD, identified with the bundled SPDX index.
+
+Walking the whole history of a large repository is slow, so the per-author
+commit counts are cached on disk by commit hash. When a repository is drafted
+again, the newest cached commit that HEAD descends from is found and only the
+commits made since then are read. Because the cache is keyed by commit, it
+works the same for local checkouts and for uploaded copies of a repository.
+
+    python -m derelict.citation path/to/repo > CITATION.cff
+"""
+import argparse
+import json
+import os
+import re
+import stat
+import sys
+import tempfile
+import zipfile
+from datetime import date
+
+import yaml
+
+from derelict.audit import strip_common_root
+from derelict.git import GitError, git_dir, run_git
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "derelict", "contributors")
+
+# Most uploaded histories are a few MB; stop well before a hostile zip fills the disk.
+MAX_EXTRACT_BYTES = 200 * 1024 * 1024
+MAX_CONFIG_BYTES = 64 * 1024
+
+# The only parts of an uploaded .git folder that are extracted: enough to read
+# the history, and nothing git would take settings, programs (config, hooks)
+# or other repositories on the server (alternates, commondir) from.
+_HISTORY_PATHS = re.compile(r"^\.git/(HEAD|packed-refs|shallow|refs/.*|objects/(?!info/).*|objects/info/packs)$")
+
+_SEPARATOR = "\x1f"
+_LICENSE_NAME = re.compile(r"^(LICENSE|LICENCE|COPYING)(\.\w+)?$", re.IGNORECASE)
+
+
+def _read_cache(cache_dir, sha):
+    try:
+        with open(os.path.join(cache_dir, f"{sha}.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(cache_dir, contributors):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{contributors['head']}.json")
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(contributors, f)
+    os.replace(tmp, path)
+
+
+def _cached_ancestor(gitdir, head, cache_dir):
+    """The cached contributors of the newest cached commit HEAD descends from."""
+    try:
+        cached = [name[:-len(".json")] for name in os.listdir(cache_dir) if name.endswith(".json")]
+    except OSError:
+        return None
+    if not cached:
+        return None
+    # One git call to find which cached commits exist in this repository at all.
+    existing = run_git(gitdir, "cat-file", "--batch-check=%(objectname) %(objecttype)",
+                       input_lines=cached).splitlines()
+    candidates = []
+    for line in existing:
+        sha, _, kind = line.partition(" ")
+        entry = _read_cache(cache_dir, sha) if kind == "commit" else None
+        if entry is not None:
+            candidates.append(entry)
+    # The cached commit with the most history behind it saves the most work.
+    for entry in sorted(candidates, key=lambda entry: entry["commits"], reverse=True):
+        if entry["head"] == head or _is_ancestor(gitdir, entry["head"], head):
+            return entry
+    return None
+
+
+def _is_ancestor(gitdir, ancestor, head):
+    try:
+        run_git(gitdir, "merge-base", "--is-ancestor", ancestor, head)
+        return True
+    except GitError:
+        return False
+
+
+def contributors(gitdir, cache_dir=DEFAULT_CACHE_DIR):
+    """Commit counts per author up to HEAD: ``{"head", "commits", "authors"}``.
+
+    ``authors`` maps a lower-cased email to ``{"name", "commits", "first", "last"}``
+    (dates of the author's first and last commits).
+    """
+    head = run_git(gitdir, "rev-parse", "HEAD").strip()
+    cached = _read_cache(cache_dir, head) if cache_dir else None
+    if cached is not None:
+        return cached
+
+    base = _cached_ancestor(gitdir, head, cache_dir) if cache_dir else None
+    result = {"head": head, "commits": 0, "authors": {}}
+    revisions = ["HEAD"]
+    if base is not None:
+        result["commits"] = base["commits"]
+        result["authors"] = {email: dict(author) for email, author in base["authors"].items()}
+        revisions = [f"{base['head']}..HEAD"]
+
+    log = run_git(gitdir, "log", "--use-mailmap", f"--format=%aN{_SEPARATOR}%aE{_SEPARATOR}%as", *revisions)
+    for line in log.splitlines():
+        name, email, day = line.split(_SEPARATOR)
+        author = result["authors"].setdefault(email.lower(), {"name": name, "commits": 0, "first": day, "last": day})
+        author["commits"] += 1
+        author["first"] = min(author["first"], day)
+        if day >= author["last"]:
+            author["last"], author["name"] = day, name  # keep the most recent spelling of the name
+        result["commits"] += 1
+
+    if cache_dir:
+        _write_cache(cache_dir, result)
+    return result
+
+
+def _person(name):
+    if name.endswith("[bot]"):
+        return None
+    parts = name.split()
+    if len(parts) >= 2:
+        return {"family-names": parts[-1], "given-names": " ".join(parts[:-1])}
+    return {"alias": name}
+
+
+def _latest_release(gitdir):
+    try:
+        tag = run_git(gitdir, "describe", "--tags", "--abbrev=0", "HEAD").strip()
+    except GitError:
+        return None, run_git(gitdir, "log", "-1", "--format=%as", "HEAD").strip()
+    released = run_git(gitdir, "log", "-1", "--format=%as", tag).strip()
+    return re.sub(r"^v(?=\d)", "", tag), released
+
+
+def _license(gitdir):
+    from derelict.audit import LICENSE_MATCH_THRESHOLD
+    from derelict.licenses import identify
+
+    for name in run_git(gitdir, "ls-tree", "--name-only", "HEAD").splitlines():
+        if _LICENSE_NAME.match(name):
+            best = identify(run_git(gitdir, "show", f"HEAD:{name}"), top=1)[0]
+            if best["similarity"] >= LICENSE_MATCH_THRESHOLD:
+                return best["id"]
+    return None
+
+
+def _origin_url(config):
+    """``remote.origin.url`` from the text of a git config file, read without running git on it."""
+    section = None
+    for line in config.splitlines():
+        line = line.strip()
+        if line.startswith("["):
+            name, _, subsection = line[1:].partition("]")[0].strip().partition(" ")
+            section = (name.lower(), subsection.strip().strip('"'))
+            continue
+        key, equals, value = line.partition("=")
+        if section == ("remote", "origin") and equals and key.strip().lower() == "url":
+            return re.split(r"\s[#;]", value.strip())[0].strip().strip('"')
+    return None
+
+
+def _read_config(gitdir):
+    try:
+        with open(os.path.join(gitdir, "config"), encoding="utf-8", errors="replace") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def _repository_url(config):
+    url = _origin_url(config)
+    if not url:
+        return None
+    match = re.match(r"^git@([^:]+):(.+?)(\.git)?$", url)
+    if match:
+        url = f"https://{match.group(1)}/{match.group(2)}"
+    return re.sub(r"\.git$", "", url) if url.startswith("http") else None
+
+
+def draft_citation(gitdir, title=None, cache_dir=DEFAULT_CACHE_DIR, max_authors=None, fallback_title=None,
+                   config=None):
+    """A ``CITATION.cff`` (as a YAML string) for the repository in ``gitdir``.
+
+    Without a ``title``, the repository name is taken from the ``origin``
+    remote, then ``fallback_title``, then the name of the checkout directory.
+    ``config`` is the text of the repository's git config, read from
+    ``gitdir`` if not given.
+    """
+    history = contributors(gitdir, cache_dir)
+    authors = sorted(history["authors"].values(), key=lambda author: (-author["commits"], author["first"], author["name"]))
+    people = [person for person in (_person(author["name"]) for author in authors) if person is not None]
+    if max_authors:
+        people = people[:max_authors]
+
+    url = _repository_url(_read_config(gitdir) if config is None else config)
+    if title is None:
+        if url:
+            title = url.rstrip("/").rsplit("/", 1)[-1]
+        else:
+            title = fallback_title or os.path.basename(os.path.dirname(os.path.abspath(gitdir)))
+    version, released = _latest_release(gitdir)
+
+    citation = {
+        "cff-version": "1.2.0",
+        "message": "If you use this software, please cite it as below.",
+        "title": title,
+        "authors": people,
+    }
+    if version:
+        citation["version"] = version
+    citation["date-released"] = date.fromisoformat(released)
+    license_id = _license(gitdir)
+    if license_id:
+        citation["license"] = license_id
+    if url:
+        citation["repository-code"] = url
+    citation["commit"] = history["head"]
+    return yaml.safe_dump(citation, sort_keys=False, allow_unicode=True)
+
+
+def _is_symlink(info):
+    return stat.S_ISLNK(info.external_attr >> 16)
+
+
+def _extract_git_dir(archive, relative, target_dir, max_bytes=MAX_EXTRACT_BYTES):
+    """Extract the history in the ``.git`` entries of ``archive`` into ``target_dir``; returns how many there were.
+
+    Only ``HEAD``, the refs and the objects are extracted (see
+    ``_HISTORY_PATHS``). Absolute paths, symlinks and anything that would land
+    outside ``target_dir`` are skipped, and extraction stops with
+    ``ValueError`` once more than ``max_bytes`` have been written.
+    """
+    root = os.path.realpath(target_dir)
+    extracted = 0
+    written = 0
+    for info in archive.infolist():
+        path = relative[info.filename]
+        absolute = info.filename.startswith("/") or re.match(r"^[A-Za-z]:", info.filename)
+        if info.is_dir() or not _HISTORY_PATHS.match(path) or absolute or "\\" in info.filename or _is_symlink(info):
+            continue
+        target = os.path.realpath(os.path.join(root, *path.split("/")))
+        if os.path.commonpath([root, target]) != root:
+            continue
+        extracted += 1
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with archive.open(info) as source, open(target, "wb") as f:
+            while chunk := source.read(1024 * 1024):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise ValueError(f"the .git folder is larger than {max_bytes // (1024 * 1024)} MB")
+                f.write(chunk)
+    return extracted
+
+
+def draft_citation_from_zip(file, **options):
+    """Draft a ``CITATION.cff`` from a zipped repository that includes its ``.git`` folder.
+
+    Only the history in the ``.git`` folder is extracted, to a temporary
+    directory; its config is parsed for the ``origin`` URL but never given to
+    git. Returns ``None`` if the zip has no ``.git`` folder.
+    """
+    with zipfile.ZipFile(file) as archive, tempfile.TemporaryDirectory() as tmp:
+        relative = strip_common_root([info.filename for info in archive.infolist()])
+        if not _extract_git_dir(archive, relative, tmp):
+            return None
+        config = ""
+        for info in archive.infolist():
+            if relative[info.filename] == ".git/config" and not _is_symlink(info):
+                with archive.open(info) as f:
+                    config = f.read(MAX_CONFIG_BYTES).decode("utf-8", errors="replace")
+        top = next(name for name, path in relative.items() if path.startswith(".git/")).split("/", 1)[0]
+        return draft_citation(os.path.join(tmp, ".git"), fallback_title=None if top == ".git" else top,
+                              config=config, **options)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Draft a CITATION.cff from a git repository's history.")
+    parser.add_argument("repo", help="path to a git repository, or a zip of one including its .git folder")
+    parser.add_argument("--title", help="software title (default: the repository name)")
+    parser.add_argument("--max-authors", type=int, help="only list the authors with the most commits")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_DIR, help=f"contributor cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true", help="walk the whole history without using the cache")
+    args = parser.parse_args(argv)
+
+    options = {"title": args.title, "cache_dir": None if args.no_cache else args.cache, "max_authors": args.max_authors}
+    try:
+        if zipfile.is_zipfile(args.repo):
+            citation = draft_citation_from_zip(args.repo, **options)
+        else:
+            gitdir = git_dir(args.repo)
+            citation = draft_citation(gitdir, **options) if gitdir else None
+    except GitError as error:
+        print(f"git failed: {error}", file=sys.stderr)
+        return 1
+    if citation is None:
+        print(f"{args.repo} is not a git repository", file=sys.stderr)
+        return 1
+    print(citation, end="")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
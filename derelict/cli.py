@@ -0,0 +1,108 @@
+"""Command-line DeReLiCT audit of many local repositories.
+
+Every subdirectory of the given directories is audited with the same checks as
+the app's "Audit my project" tab, across a process pool, and one JSON line is
+printed per repository as soon as it finishes:
+
+    python -m derelict.cli ~/research-repos --jobs 8 > audit.jsonl
+
+Results are cached by repository path and HEAD commit, so on the next run only
+repositories with new commits (or without git) are scanned again.
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from derelict.audit import audit_directory
+from derelict.git import head_commit
+
+# Bump when the checks change, so cached results from older checks are dropped.
+CACHE_VERSION = 1
+
+DEFAULT_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "derelict", "audit.json")
+
+
+def load_cache(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache.get("repos", {})
+
+
+def save_cache(path, repos):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "repos": repos}, f)
+    os.replace(tmp, path)
+
+
+def find_repos(directories):
+    repos = []
+    for directory in directories:
+        for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+            if entry.is_dir() and not entry.name.startswith("."):
+                repos.append(os.path.abspath(entry.path))
+    return repos
+
+
+def audit_repo(repo, head):
+    checks = audit_directory(repo)
+    return {
+        "repo": repo,
+        "head": head,
+        "score": sum(check["found"] for check in checks),
+        "checks": checks,
+    }
+
+
+def emit(result, cached):
+    print(json.dumps({**result, "cached": cached}), flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the DeReLiCT checks on every repository in one or more directories.")
+    parser.add_argument("directories", nargs="+", help="directories whose subdirectories are repositories to audit")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="number of worker processes (default: CPU count)")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help=f"results cache file (default: {DEFAULT_CACHE})")
+    parser.add_argument("--no-cache", action="store_true", help="ignore cached results and scan every repository")
+    args = parser.parse_args(argv)
+
+    cache = {} if args.no_cache else load_cache(args.cache)
+    todo = []
+    for repo in find_repos(args.directories):
+        head = head_commit(repo)
+        cached = cache.get(repo)
+        if head is not None and cached is not None and cached["head"] == head:
+            emit(cached, cached=True)
+        else:
+            todo.append((repo, head))
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {pool.submit(audit_repo, repo, head): repo for repo, head in todo}
+        for future in as_completed(futures):
+            repo = futures[future]
+            try:
+                result = future.result()
+            except Exception as error:  # one broken repository shouldn't stop the batch
+                failed += 1
+                print(json.dumps({"repo": repo, "error": str(error)}), flush=True)
+                continue
+            if result["head"] is not None:
+                cache[repo] = result
+            emit(result, cached=False)
+
+    if not args.no_cache:
+        save_cache(args.cache, cache)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
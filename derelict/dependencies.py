@@ -0,0 +1,514 @@
+"""Analyse dependency files: pip ``requirements.txt``, conda ``env.yml`` and ``pyproject.toml``.
+
+Each entry is classified as pinned (one exact version), loose (some version
+constraint) or unbounded (no constraint), repeated and conflicting entries are
+flagged, and two exports can be diffed (e.g. ``conda env export
+--from-history`` against a full ``conda env export``).
+
+Versions are checked against a bundled snapshot of PyPI metadata in
+``derelict/data/packages.json``: a single dict from normalised package name to
+its latest version and known releases, so every lookup is a dict access and
+nothing goes over the network. Refresh it with:
+
+    python -m derelict.dependencies --build-index package-names.txt
+
+``--self-check`` runs the parsers on small cases they have got wrong before.
+"""
+import argparse
+import datetime
+import functools
+import json
+import re
+import sys
+import tomllib
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.specifiers import InvalidSpecifier, SpecifierSet
+from packaging.utils import canonicalize_name, canonicalize_version
+from packaging.version import InvalidVersion, Version
+
+INDEX_PATH = Path(__file__).resolve().parent / "data" / "packages.json"
+
+PINNED = "pinned"
+LOOSE = "loose"
+UNBOUNDED = "unbounded"
+
+# Conda packages that are not Python libraries on PyPI.
+NOT_ON_PYPI = {"python", "pip", "conda", "libgcc-ng", "libstdcxx-ng", "openssl", "ca-certificates", "tk", "xz",
+               "zlib", "sqlite", "readline", "ncurses", "libffi", "bzip2", "tzdata", "ld_impl_linux-64", "_libgcc_mutex",
+               "_openmp_mutex", "libgomp", "libzlib", "libuuid", "libnsl", "libsqlite", "libexpat", "liblzma"}
+
+
+def _entry(name, specifier, raw, line, source, marker=None):
+    specifier = specifier or ""
+    try:
+        specs = SpecifierSet(specifier)
+    except InvalidSpecifier:
+        specs = None
+    version = None
+    if specs is not None and len(specs) == 1:
+        spec = next(iter(specs))
+        if spec.operator in ("==", "===") and not spec.version.endswith(".*"):
+            version = spec.version
+    if version is not None or specifier.startswith("@"):
+        kind = PINNED
+    elif specifier:
+        kind = LOOSE
+    else:
+        kind = UNBOUNDED
+    return {"name": canonicalize_name(name), "specifier": specifier, "kind": kind, "version": version,
+            "marker": marker, "raw": raw.strip(), "line": line, "source": source}
+
+
+def _conda_entry(raw, line):
+    spec = raw.split("::")[-1].strip()  # drop a channel prefix such as conda-forge::
+    match = re.match(r"^([A-Za-z0-9_.\-]+)\s*(.*)$", spec)
+    if not match:
+        return None
+    name, rest = match.groups()
+    rest = rest.strip()
+    if rest.startswith("=") and not rest.startswith("=="):
+        # name=version[=build]: an exact version, or a prefix such as 1.21
+        # which conda treats as 1.21.*
+        version = rest[1:].split("=")[0]
+        exact = raw.count("=") >= 2 or len(version.split(".")) >= 3
+        specifier = f"=={version}" if exact or version.endswith("*") else f"=={version}.*"
+    elif rest and rest[0].isdigit():
+        specifier = "==" + rest.split()[0]  # "numpy 1.21.*" style match specs
+    else:
+        specifier = rest.replace(" ", "")
+    return _entry(name, specifier, raw, line, "conda")
+
+
+def _pip_entry(raw, line):
+    try:
+        requirement = Requirement(raw)
+    except InvalidRequirement:
+        if re.match(r"^[A-Za-z0-9_.\-]+=[^=]", raw):
+            return _conda_entry(raw, line)  # `conda list --export` format
+        return None
+    specifier = f"@ {requirement.url}" if requirement.url else str(requirement.specifier)
+    marker = str(requirement.marker) if requirement.marker else None
+    return _entry(requirement.name, specifier, raw, line, "pip", marker)
+
+
+def parse_requirements(text):
+    entries, skipped = [], []
+    lines = text.replace("\\\n", " ").splitlines()
+    for number, line in enumerate(lines, start=1):
+        line = re.sub(r"(^|\s)#.*$", "", line).strip()
+        line = re.sub(r"\s--hash[=\s]\S+", "", line)
+        if not line:
+            continue
+        if line.startswith("-"):
+            skipped.append({"line": number, "raw": line, "reason": "pip option"})
+            continue
+        entry = _pip_entry(line, number)
+        if entry is None:
+            skipped.append({"line": number, "raw": line, "reason": "could not parse"})
+        else:
+            entries.append(entry)
+    return entries, skipped
+
+
+def parse_conda(text):
+    import yaml
+
+    entries, skipped = [], []
+    environment = yaml.safe_load(text) or {}
+    if not isinstance(environment, dict):
+        raise ValueError(f"expected a conda environment file (a mapping with a `dependencies` list), "
+                         f"not a YAML {type(environment).__name__}")
+    dependencies = environment.get("dependencies") or []
+    if not isinstance(dependencies, list):
+        raise ValueError(f"expected `dependencies` to be a list, not a YAML {type(dependencies).__name__}")
+
+    # Every "- item" line, so entries are matched to a whole list item (not
+    # numpy to a numpyro line), searching on from the previous match because
+    # the dependencies are listed in file order.
+    item = re.compile(r"""^\s*-\s*(['"]?)(.*?)\1(?:\s+#.*)?\s*$""")
+    items = [(number, match.group(2)) for number, line in enumerate(text.splitlines(), start=1)
+             if (match := item.match(line))]
+    position = 0
+
+    def line_of(raw):
+        nonlocal position
+        for index in range(position, len(items)):
+            if items[index][1] == raw:
+                position = index + 1
+                return items[index][0]
+        return None
+
+    for dependency in dependencies:
+        if isinstance(dependency, dict):
+            for raw in dependency.get("pip") or []:
+                raw = str(raw)
+                line = line_of(raw)
+                entry = _pip_entry(raw, line) if not raw.startswith("-") else None
+                if entry is None:
+                    skipped.append({"line": line, "raw": raw, "reason": "pip option" if raw.startswith("-") else "could not parse"})
+                else:
+                    entries.append(entry)
+            continue
+        raw = str(dependency)
+        line = line_of(raw)
+        entry = _conda_entry(raw, line)
+        if entry is None:
+            skipped.append({"line": line, "raw": raw, "reason": "could not parse"})
+        else:
+            entries.append(entry)
+    return entries, skipped
+
+
+def _poetry_range(spec):
+    """A Poetry caret or tilde requirement as a PEP 440 range, e.g. ``^1.2`` as ``>=1.2,<2.0``."""
+    operator, version = spec[0], spec[1:]
+    try:
+        release = Version(version).release
+    except InvalidVersion:
+        return spec
+    if operator == "^":
+        # The leftmost non-zero part may not change: ^0.2.3 is >=0.2.3,<0.3.0.
+        bump = next((i for i, part in enumerate(release) if part), len(release) - 1)
+    else:
+        # Only the last part given may change, or the minor version if more are given: ~1 is <2, ~1.2.3 is <1.3.0.
+        bump = min(1, len(release) - 1)
+    upper = [*release[:bump], release[bump] + 1] + [0] * (len(release) - bump - 1)
+    return f">={version},<{'.'.join(map(str, upper))}"
+
+
+def _poetry_specifier(spec):
+    if isinstance(spec, dict):
+        if "git" in spec:
+            revision = spec.get("rev") or spec.get("tag") or spec.get("branch")
+            return f"@ git+{spec['git']}" + (f"@{revision}" if revision else "")
+        if "path" in spec or "url" in spec:
+            return f"@ {spec.get('url') or spec['path']}"
+        spec = spec.get("version", "")
+    spec = str(spec).strip()
+    if spec in ("", "*"):
+        return ""
+    if spec[0].isdigit():
+        return "==" + spec
+    # Caret and tilde ranges may be combined with other constraints, e.g. "^1.2, !=1.4.0".
+    return ",".join(_poetry_range(part) if part.startswith(("^", "~")) and not part.startswith("~=") else part
+                    for part in spec.replace(" ", "").split(","))
+
+
+def _poetry_marker(spec):
+    """A dependency's ``python`` and ``markers`` restrictions as one PEP 508 marker, or ``None``."""
+    if not isinstance(spec, dict):
+        return None
+    markers = []
+    python = _poetry_specifier(spec.get("python", ""))
+    if python:
+        try:
+            markers.extend(f'python_version {part.operator} "{part.version}"' for part in SpecifierSet(python))
+        except InvalidSpecifier:
+            markers.append(f'python_version in "{python}"')
+    if spec.get("markers"):
+        markers.append(f"({spec['markers']})" if markers else spec["markers"])
+    return " and ".join(markers) or None
+
+
+def parse_pyproject(text):
+    data = tomllib.loads(text)
+    entries, skipped = [], []
+    project = data.get("project", {})
+    requirements = list(project.get("dependencies", []))
+    for extra in project.get("optional-dependencies", {}).values():
+        requirements.extend(extra)
+    for raw in requirements:
+        entry = _pip_entry(raw, None)
+        if entry is None:
+            skipped.append({"line": None, "raw": raw, "reason": "could not parse"})
+        else:
+            entries.append(entry)
+    for name, spec in data.get("tool", {}).get("poetry", {}).get("dependencies", {}).items():
+        # A list holds alternative constraints, each for its own environment.
+        for constraint in spec if isinstance(spec, list) else [spec]:
+            entries.append(_entry(name, _poetry_specifier(constraint), f"{name} = {constraint!r}", None, "poetry",
+                                  _poetry_marker(constraint)))
+    return entries, skipped
+
+
+def detect_format(text, filename=None):
+    if filename:
+        name = filename.lower()
+        if name.endswith(".toml"):
+            return "pyproject"
+        if name.endswith((".yml", ".yaml")):
+            return "conda"
+        if name.endswith((".txt", ".in")):
+            return "requirements"
+    if re.search(r"^\[(project|tool\.poetry)", text, re.MULTILINE):
+        return "pyproject"
+    if re.search(r"^dependencies\s*:", text, re.MULTILINE):
+        return "conda"
+    return "requirements"
+
+
+PARSERS = {"requirements": parse_requirements, "conda": parse_conda, "pyproject": parse_pyproject}
+
+
+def parse(text, filename=None):
+    """Parse a dependency file into ``(entries, skipped_lines)``."""
+    return PARSERS[detect_format(text, filename)](text)
+
+
+@functools.lru_cache(maxsize=None)
+def load_package_index():
+    """The bundled PyPI snapshot: ``{"packages": {name: {"latest", "releases", "known"}}, ...}``.
+
+    ``known`` is the set of canonical release versions, so "2.0" matches a
+    "2.0.0" release.
+    """
+    if not INDEX_PATH.exists():
+        return {"created": None, "packages": {}}
+    index = json.loads(INDEX_PATH.read_text(encoding="utf-8"))
+    for package in index["packages"].values():
+        package["known"] = {canonicalize_version(release) for release in package["releases"]}
+    return index
+
+
+def check_versions(entries, index=None):
+    """Notes on each entry from the offline index, keyed by position in ``entries``."""
+    index = index or load_package_index()
+    notes = {}
+    for position, entry in enumerate(entries):
+        if entry["name"] in NOT_ON_PYPI:
+            continue
+        package = index["packages"].get(entry["name"])
+        if package is None:
+            continue
+        if entry["version"] is not None:
+            if canonicalize_version(entry["version"]) not in package["known"]:
+                notes[position] = f"{entry['version']} is not a known release (latest is {package['latest']})"
+            elif canonicalize_version(entry["version"]) != canonicalize_version(package["latest"]):
+                notes[position] = f"latest is {package['latest']}"
+        elif entry["specifier"] and not entry["specifier"].startswith("@"):
+            try:
+                specs = SpecifierSet(entry["specifier"])
+            except InvalidSpecifier:
+                continue
+            if not any(specs.contains(release, prereleases=True) for release in package["releases"]):
+                notes[position] = f"no known release matches `{entry['specifier']}`"
+    return notes
+
+
+def _conflict(name, repeated, index):
+    """Whether no single version satisfies every entry in ``repeated``."""
+    pins = {entry["version"] for entry in repeated if entry["version"] is not None}
+    specs = []
+    for entry in repeated:
+        try:
+            specs.append(SpecifierSet(entry["specifier"]) if not entry["specifier"].startswith("@") else SpecifierSet())
+        except InvalidSpecifier:
+            specs.append(SpecifierSet())
+    if len(pins) > 1:
+        return True
+    if pins:
+        pin = pins.pop()
+        try:
+            return not all(spec.contains(Version(pin), prereleases=True) for spec in specs)
+        except InvalidVersion:
+            return False
+    package = index["packages"].get(name)
+    if package is None:
+        return False
+    combined = functools.reduce(lambda a, b: a & b, specs)
+    return not any(combined.contains(release, prereleases=True) for release in package["releases"])
+
+
+def duplicates(entries, index=None):
+    """Packages listed more than once for the same environment, and whether the entries conflict.
+
+    Entries with different environment markers (e.g. ``numpy==1.21.0;
+    python_version<"3.8"`` and ``numpy==1.26.0; python_version>="3.8"``) are
+    for different environments, so they are only compared with each other's
+    unmarked entries, which apply everywhere.
+    """
+    index = index or load_package_index()
+    by_name = {}
+    for entry in entries:
+        by_name.setdefault(entry["name"], []).append(entry)
+
+    found = []
+    for name, listed in by_name.items():
+        markers = list(dict.fromkeys(entry["marker"] for entry in listed))
+        groups = [[entry for entry in listed if entry["marker"] in (marker, None)] for marker in markers]
+        groups = [group for group in groups if len(group) > 1]
+        if not groups:
+            continue
+        repeated = [entry for entry in listed if any(entry in group for group in groups)]
+        conflict = any(_conflict(name, group, index) for group in groups)
+        found.append({"name": name, "entries": repeated, "conflict": conflict})
+    return found
+
+
+def diff(old, new):
+    """Compare two lists of entries by package name."""
+    old_by_name = {entry["name"]: entry for entry in old}
+    new_by_name = {entry["name"]: entry for entry in new}
+    rows = []
+    for name in sorted(old_by_name.keys() | new_by_name.keys()):
+        before, after = old_by_name.get(name), new_by_name.get(name)
+        if before is None:
+            change = "added"
+        elif after is None:
+            change = "removed"
+        elif before["specifier"] != after["specifier"]:
+            change = "changed"
+        else:
+            continue
+        rows.append({
+            "name": name,
+            "change": change,
+            "before": (before["specifier"] or "(any)") if before else "",
+            "after": (after["specifier"] or "(any)") if after else "",
+        })
+    return rows
+
+
+def _fetch(name):
+    with urllib.request.urlopen(f"https://pypi.org/pypi/{name}/json", timeout=30) as response:
+        data = json.load(response)
+    releases = []
+    for version, files in data["releases"].items():
+        if not files or all(f.get("yanked") for f in files):
+            continue
+        try:
+            Version(version)
+        except InvalidVersion:
+            continue
+        releases.append(version)
+    releases.sort(key=Version)
+    return canonicalize_name(data["info"]["name"]), {"latest": data["info"]["version"], "releases": releases}
+
+
+def build_index(names, workers=16):
+    packages = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for name, package in pool.map(_fetch, sorted({canonicalize_name(name) for name in names})):
+            packages[name] = package
+    INDEX_PATH.parent.mkdir(exist_ok=True)
+    INDEX_PATH.write_text(json.dumps({
+        "created": datetime.date.today().isoformat(),
+        "packages": dict(sorted(packages.items())),
+    }, separators=(",", ":")), encoding="utf-8")
+    load_package_index.cache_clear()
+    return len(packages)
+
+
+# -- Self-check ----------------------------------------------------------------
+
+def _specifiers(text, filename):
+    return [(entry["name"], entry["specifier"], entry["marker"]) for entry in parse(text, filename)[0]]
+
+
+def _conflicts(text, filename):
+    return {duplicate["name"]: duplicate["conflict"] for duplicate in duplicates(parse(text, filename)[0])}
+
+
+def _raises(text, filename):
+    try:
+        parse(text, filename)
+    except ValueError:
+        return True
+    return False
+
+
+# (what is checked, whether it holds): cases the parsers have got wrong before.
+SELF_CHECKS = [
+    ("conda: a YAML list is not an environment", lambda: _raises("- numpy\n- pandas\n", "env.yml")),
+    ("conda: `dependencies` must be a list", lambda: _raises("dependencies: numpy\n", "env.yml")),
+    ("conda: numpy is on its own line, not numpyro's", lambda: [
+        entry["line"] for entry in parse("dependencies:\n  - numpyro\n  - numpy\n  - numpy\n", "env.yml")[0]
+    ] == [2, 3, 4]),
+    ("conda: a quoted item is found", lambda: parse("dependencies:\n  - 'scipy>=1.9'\n", "env.yml")[0][0]["line"] == 2),
+    ("requirements: environment markers are kept", lambda: _specifiers(
+        'numpy==1.21.0; python_version < "3.8"\n', "requirements.txt"
+    ) == [("numpy", "==1.21.0", 'python_version < "3.8"')]),
+    ("requirements: pins for different environments don't conflict", lambda: _conflicts(
+        'numpy==1.21.0; python_version<"3.8"\nnumpy==1.26.0; python_version>="3.8"\n', "requirements.txt") == {}),
+    ("requirements: an unmarked pin applies everywhere", lambda: _conflicts(
+        'numpy==1.21.0; python_version<"3.8"\nnumpy==1.26.0\n', "requirements.txt") == {"numpy": True}),
+    ("requirements: different pins conflict", lambda: _conflicts(
+        "numpy==1.21.0\nnumpy==1.26.0\n", "requirements.txt") == {"numpy": True}),
+    ("poetry: caret and tilde ranges", lambda: [_poetry_specifier(spec) for spec in (
+        "^1.2", "^0.2.3", "^0.0.3", "~1.2.3", "~1", "~=1.2", "^1.2, !=1.4.0", "1.2.3", "*")] == [
+        ">=1.2,<2.0", ">=0.2.3,<0.3.0", ">=0.0.3,<0.0.4", ">=1.2.3,<1.3.0", ">=1,<2", "~=1.2",
+        ">=1.2,<2.0,!=1.4.0", "==1.2.3", ""]),
+    ("poetry: a list of constraints is one entry per environment", lambda: _specifiers(
+        '[tool.poetry.dependencies]\nnumpy = [{version = "<1.22", python = "<3.8"}, '
+        '{version = ">=1.22", python = ">=3.8"}]\n', "pyproject.toml"
+    ) == [("numpy", "<1.22", 'python_version < "3.8"'), ("numpy", ">=1.22", 'python_version >= "3.8"')]),
+    ("poetry: git, path and url dependencies are direct references", lambda: [
+        (entry["specifier"], entry["kind"]) for entry in parse(
+            '[tool.poetry.dependencies]\na = {git = "https://example.com/a.git", tag = "v1.0"}\n'
+            'b = {path = "../b", develop = true}\nc = {url = "https://example.com/c.whl"}\n', "pyproject.toml")[0]
+    ] == [("@ git+https://example.com/a.git@v1.0", PINNED), ("@ ../b", PINNED),
+          ("@ https://example.com/c.whl", PINNED)]),
+]
+
+
+def self_check():
+    """Run ``SELF_CHECKS`` and return the descriptions of the ones that failed."""
+    failed = []
+    for description, check in SELF_CHECKS:
+        try:
+            ok = check()
+        except Exception as error:  # a check that raises has failed too
+            ok = False
+            description = f"{description} ({error!r})"
+        if not ok:
+            failed.append(description)
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse a dependency file, or rebuild the offline package index.")
+    parser.add_argument("file", nargs="?", help="requirements.txt, env.yml or pyproject.toml to analyse")
+    parser.add_argument("--diff", metavar="OTHER", help="compare FILE with another dependency file")
+    parser.add_argument("--build-index", metavar="NAMES",
+                        help="file with one package name per line to snapshot from PyPI into the index")
+    parser.add_argument("--self-check", action="store_true", help="check the parsers against cases they have got wrong before")
+    args = parser.parse_args(argv)
+
+    if args.self_check:
+        failed = self_check()
+        for description in failed:
+            print(f"FAILED  {description}", file=sys.stderr)
+        print(f"{len(SELF_CHECKS) - len(failed)} of {len(SELF_CHECKS)} checks passed")
+        return 1 if failed else 0
+
+    if args.build_index:
+        names = [line.strip() for line in Path(args.build_index).read_text().splitlines() if line.strip() and not line.startswith("#")]
+        print(f"indexed {build_index(names)} packages into {INDEX_PATH}")
+        return 0
+    if not args.file:
+        parser.error("give a dependency file to analyse, or --build-index/--self-check")
+
+    entries, skipped = parse(Path(args.file).read_text(encoding="utf-8"), args.file)
+    if args.diff:
+        other, _ = parse(Path(args.diff).read_text(encoding="utf-8"), args.diff)
+        for row in diff(entries, other):
+            print(f"{row['change']:>8}  {row['name']:<30} {row['before']:<20} {row['after']}")
+        return 0
+
+    notes = check_versions(entries)
+    for position, entry in enumerate(entries):
+        print(f"{entry['kind']:>9}  {entry['name']:<30} {entry['specifier']:<20} {notes.get(position, '')}")
+    for duplicate in duplicates(entries):
+        print(f"{'conflict' if duplicate['conflict'] else 'duplicate'}: {duplicate['name']} is listed "
+              f"{len(duplicate['entries'])} times")
+    for line in skipped:
+        print(f"skipped line {line['line']}: {line['raw']} ({line['reason']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""Export the guide as a static HTML page.
+
+The app is run headlessly with ``streamlit.testing.v1.AppTest`` once per tab,
+and the resulting element tree is written out as plain HTML, so the static page
+shows exactly what the live app renders. The Vega scripts that draw its charts
+are copied next to it from ``derelict/data/vendor``, so the page works offline.
+Run it from the repository root:
+
+    python -m derelict.export --out site
+    python -m derelict.export --check
+
+``--check`` writes nothing: it renders the app, exports it in memory and fails
+if any text in the app's element tree is missing from the page, e.g. because
+a new kind of element isn't exported yet. Element kinds the exporter doesn't
+know about are an error rather than being silently dropped; what only works
+in the live app (the search box, links to the interactive tabs) is marked by
+putting it in a ``derelict.sections.live_only`` container.
+"""
+import argparse
+import html
+import itertools
+import json
+import re
+import shutil
+import sys
+from html.parser import HTMLParser
+from pathlib import Path
+
+import markdown
+import pyarrow as pa
+from streamlit.testing.v1 import AppTest
+
+from derelict.sections import LIVE_ONLY, SECTIONS
+
+APP_PATH = Path(__file__).resolve().parent.parent / "app.py"
+VENDOR_DIR = Path(__file__).resolve().parent / "data" / "vendor"
+
+# Vega-Lite charts are embedded as JSON and drawn in the browser with vega-embed.
+VEGA_SCRIPTS = ["vega-6.1.2.min.js", "vega-lite-6.3.0.min.js", "vega-embed-7.0.2.min.js"]
+
+PAGE_CSS = """
+body { font-family: "Source Sans Pro", sans-serif; max-width: 60rem; margin: 2rem auto; padding: 0 1rem; line-height: 1.6; }
+nav a { margin-right: 1.5rem; font-size: 24px; color: #ea388f; text-decoration: none; }
+section { border-top: 2px solid #eab4e2; margin-top: 2rem; }
+details { border: 1px solid #eab4e2; border-radius: 4px; padding: 0.5rem 1rem; margin: 1rem 0; }
+summary { cursor: pointer; }
+pre { background: #F0F2F6; padding: 1rem; overflow-x: auto; }
+blockquote { border-left: 4px solid #eab4e2; margin-left: 0; padding-left: 1rem; }
+.caption { color: gray; font-size: 0.9rem; }
+.chart { width: 100%; }
+.alert { border-radius: 4px; padding: 0.75rem 1rem; margin: 1rem 0; }
+.alert p { margin: 0; }
+.alert-info { background: #e6f0fb; }
+.alert-success { background: #e6f5ea; }
+.alert-warning { background: #fdf6dc; }
+.alert-error { background: #fde8e8; }
+"""
+
+ALERTS = {"info", "success", "warning", "error"}
+
+# Layout blocks whose children are written out in place.
+CONTAINERS = {"flex_container", "tab"}
+
+
+def anchor_for(text):
+    # Same rule Streamlit uses to give headers an anchor, so deep links such as
+    # #pinning-specific-versions-of-libraries work on the static page too.
+    return "-".join(re.sub(r"[\W_]+", "", word) for word in text.lower().split(" "))
+
+
+def render_app(section_slug=None):
+    at = AppTest.from_file(str(APP_PATH), default_timeout=30)
+    if section_slug is not None:
+        at.query_params["section"] = section_slug
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"app.py raised while rendering section {section_slug!r}: {at.exception[0].message}")
+    return at._tree.children[0]
+
+
+def open_tab(main):
+    for node in main.children.values():
+        if getattr(node, "type", None) == "tab_container":
+            for tab in node.children.values():
+                if tab.children:
+                    return tab
+    raise RuntimeError("no open tab found in the rendered app")
+
+
+def render_guide():
+    """``(section, nodes)`` for the introduction above the tabs (section ``None``), then every exported tab."""
+    main = render_app()
+    # Everything above the tabs (title and introduction) is the same for every tab.
+    intro = itertools.takewhile(lambda node: getattr(node, "type", None) != "tab_container", main.children.values())
+    guide = [(None, list(intro))]
+    for section in SECTIONS:
+        if not section.get("interactive"):
+            guide.append((section, list(open_tab(render_app(section["slug"])).children.values())))
+    return guide
+
+
+def is_live_only(node):
+    """Whether ``node`` is a ``derelict.sections.live_only`` container, left out of the static page."""
+    # Widget and container ids end with the key they were given.
+    return (getattr(node, "type", None) == "flex_container"
+            and node.proto.id.split("-", 2)[-1].startswith(f"{LIVE_ONLY}-"))
+
+
+def is_script(node):
+    """Whether ``node`` is an ``st.html`` element with nothing visible, such as the app's scripts."""
+    return getattr(node, "type", None) == "html" and not visible_text(node.proto.body)
+
+
+def chart_spec(proto):
+    spec = json.loads(proto.spec)
+    if proto.datasets:
+        spec["datasets"] = {
+            dataset.name: pa.ipc.open_stream(dataset.data.data).read_all().to_pylist()
+            for dataset in proto.datasets
+        }
+    return spec
+
+
+class HTMLWriter:
+    def __init__(self):
+        self.parts = []
+        self.anchors = set()
+        self.charts = 0
+
+    def heading(self, tag, text):
+        anchor = anchor_for(text)
+        body = markdown.markdown(text).removeprefix("<p>").removesuffix("</p>")
+        if anchor in self.anchors:
+            self.parts.append(f"<{tag}>{body}</{tag}>")
+        else:
+            self.anchors.add(anchor)
+            self.parts.append(f'<{tag} id="{anchor}">{body}</{tag}>')
+
+    def node(self, node):
+        kind = getattr(node, "type", None)
+        if kind == "title":
+            self.heading("h1", node.value)
+        elif kind == "header":
+            self.heading("h2", node.value)
+        elif kind == "subheader":
+            self.heading("h3", node.value)
+        elif kind == "markdown":
+            self.parts.append(markdown.markdown(node.value))
+        elif kind == "caption":
+            self.parts.append(f'<div class="caption">{markdown.markdown(node.value)}</div>')
+        elif kind in ALERTS:
+            self.parts.append(f'<div class="alert alert-{kind}">{markdown.markdown(node.value)}</div>')
+        elif kind == "divider":
+            self.parts.append("<hr>")
+        elif kind == "code":
+            language = node.language or "text"
+            self.parts.append(f'<pre><code class="language-{language}">{html.escape(node.value)}</code></pre>')
+        elif kind == "vega_lite_chart":
+            self.charts += 1
+            chart_id = f"chart-{self.charts}"
+            self.parts.append(f'<div class="chart" id="{chart_id}"></div>')
+            self.parts.append(
+                f'<script>vegaEmbed("#{chart_id}", {json.dumps(chart_spec(node.proto), sort_keys=True)}, '
+                '{"actions": false});</script>'
+            )
+        elif kind == "popover":
+            self.parts.append(f"<details><summary>{html.escape(node.proto.popover.label)}</summary>")
+            self.children(node)
+            self.parts.append("</details>")
+        elif is_live_only(node) or is_script(node):
+            return
+        elif kind in CONTAINERS:
+            self.children(node)
+        else:
+            raise ValueError(f"don't know how to export a {kind!r} element: add it to HTMLWriter.node, "
+                             "or put it in a derelict.sections.live_only container if it only works in the live app")
+
+    def children(self, node):
+        for child in getattr(node, "children", {}).values():
+            self.node(child)
+
+
+class _VisibleText(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.words = []
+        self._hidden = 0
+
+    def handle_starttag(self, tag, attrs):
+        self._hidden += tag in ("script", "style")
+
+    def handle_endtag(self, tag):
+        self._hidden -= tag in ("script", "style")
+
+    def handle_data(self, data):
+        if not self._hidden:
+            self.words.extend(data.split())
+
+
+def visible_text(fragment):
+    """The words of an HTML fragment as a browser shows them, without scripts and styles."""
+    parser = _VisibleText()
+    parser.feed(fragment)
+    parser.close()
+    return " ".join(parser.words)
+
+
+def element_text(node):
+    """The text of ``node`` and its children, as it should appear on the static page."""
+    kind = getattr(node, "type", None)
+    if is_live_only(node) or is_script(node):
+        return []
+    if kind in ("title", "header", "subheader", "markdown", "caption", *ALERTS):
+        return [visible_text(markdown.markdown(node.value))]
+    if kind == "code":
+        return [" ".join(node.value.split())]
+    texts = [node.proto.popover.label] if kind == "popover" else []
+    for child in getattr(node, "children", {}).values():
+        texts.extend(element_text(child))
+    return texts
+
+
+def missing_text(guide, page):
+    """The first text of the element tree that isn't on ``page``, in order, or ``None``."""
+    page_text = visible_text(page.split("<body>", 1)[-1])
+    position = 0
+    for _, nodes in guide:
+        for text in itertools.chain.from_iterable(element_text(node) for node in nodes):
+            found = page_text.find(text, position)
+            if found < 0:
+                return text
+            position = found + len(text)
+    return None
+
+
+def export_html(guide=None):
+    guide = render_guide() if guide is None else guide
+    writer = HTMLWriter()
+    for node in guide[0][1]:
+        writer.node(node)
+
+    nav = " ".join(
+        f'<a href="#section-{section["slug"]}">{markdown.markdown(section["label"].strip()).removeprefix("<p>").removesuffix("</p>")}</a>'
+        for section in SECTIONS if not section.get("interactive")
+    )
+    writer.parts.append(f"<nav>{nav}</nav>")
+
+    for section, nodes in guide[1:]:
+        writer.parts.append(f'<section id="section-{section["slug"]}">')
+        for node in nodes:
+            writer.node(node)
+        writer.parts.append("</section>")
+
+    body = "\n".join(writer.parts)
+    scripts = "\n".join(f'<script src="vendor/{name}"></script>' for name in VEGA_SCRIPTS)
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>DeReLiCT Code</title>
+<style>{PAGE_CSS}</style>
+{scripts}
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the DeReLiCT guide as a static HTML page.")
+    parser.add_argument("--out", default="site", help="directory to write index.html to (default: site)")
+    parser.add_argument("--check", action="store_true",
+                        help="don't write anything, fail if the exported page leaves out text the app renders")
+    args = parser.parse_args(argv)
+
+    guide = render_guide()
+    page = export_html(guide)
+    if args.check:
+        missing = missing_text(guide, page)
+        if missing is not None:
+            print(f"the exported page is missing text the app renders: {missing[:200]!r}", file=sys.stderr)
+            return 1
+        print("the exported page has all the text the app renders")
+        return 0
+
+    index = Path(args.out) / "index.html"
+
+    (index.parent / "vendor").mkdir(parents=True, exist_ok=True)
+    for name in [*VEGA_SCRIPTS, "LICENSE"]:
+        shutil.copyfile(VENDOR_DIR / name, index.parent / "vendor" / name)
+    index.write_text(page, encoding="utf-8")
+    print(f"wrote {index}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Small helpers for reading git repositories on disk."""
+import os
+import subprocess
+
+
+class GitError(Exception):
+    pass
+
+
+def git_dir(repo):
+    """The ``.git`` directory of ``repo``, following ``gitdir:`` files (worktrees, submodules)."""
+    path = os.path.join(repo, ".git")
+    if os.path.isfile(path):
+        with open(path, encoding="utf-8") as f:
+            line = f.read().strip()
+        if line.startswith("gitdir:"):
+            return os.path.normpath(os.path.join(repo, line[len("gitdir:"):].strip()))
+        return None
+    return path if os.path.isdir(path) else None
+
+
+def head_commit(repo):
+    """The commit hash HEAD points to, or ``None`` if ``repo`` isn't a git repository.
+
+    Reads ``HEAD`` and the refs directly instead of running ``git``, which is
+    much cheaper when checking hundreds of repositories.
+    """
+    gitdir = git_dir(repo)
+    if gitdir is None:
+        return None
+    try:
+        with open(os.path.join(gitdir, "HEAD"), encoding="utf-8") as f:
+            head = f.read().strip()
+    except OSError:
+        return None
+    if not head.startswith("ref:"):
+        return head or None
+    ref = head[len("ref:"):].strip()
+
+    # Worktrees keep their refs in the main repository's git directory.
+    common = gitdir
+    commondir_file = os.path.join(gitdir, "commondir")
+    if os.path.isfile(commondir_file):
+        with open(commondir_file, encoding="utf-8") as f:
+            common = os.path.normpath(os.path.join(gitdir, f.read().strip()))
+
+    for base in (gitdir, common):
+        try:
+            with open(os.path.join(base, *ref.split("/")), encoding="utf-8") as f:
+                return f.read().strip()
+        except OSError:
+            pass
+    try:
+        with open(os.path.join(common, "packed-refs"), encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(("#", "^")):
+                    continue
+                sha, _, name = line.strip().partition(" ")
+                if name == ref:
+                    return sha
+    except OSError:
+        pass
+    return None  # a branch with no commits yet
+
+
+# Repositories may be uploaded by anyone, so git never reads the system or
+# user config, and the settings that make reading commands run other programs
+# (signature checks, fsmonitor, hooks) are switched off whatever the
+# repository's own config says.
+_NEUTRAL_ENV = {"GIT_CONFIG_NOSYSTEM": "1", "GIT_CONFIG_GLOBAL": "/dev/null", "GIT_ATTR_NOSYSTEM": "1",
+                "GIT_TERMINAL_PROMPT": "0"}
+_NEUTRAL_CONFIG = ["-c", "log.showSignature=false", "-c", "core.fsmonitor=", "-c", "core.hooksPath=/dev/null"]
+
+
+def run_git(gitdir, *args, input_lines=None):
+    """Run a git command against the repository in ``gitdir`` and return its stdout."""
+    stdin = "".join(f"{line}\n" for line in input_lines) if input_lines is not None else None
+    result = subprocess.run(["git", f"--git-dir={gitdir}", *_NEUTRAL_CONFIG, *args], input=stdin, capture_output=True,
+                            text=True, encoding="utf-8", errors="replace", env={**os.environ, **_NEUTRAL_ENV})
+    if result.returncode != 0:
+        raise GitError(result.stderr.strip() or f"git {args[0]} failed")
+    return result.stdout
@@ -0,0 +1,148 @@
+"""Identify a license text against a bundled index of SPDX licenses.
+
+Every license in the corpus is reduced to a MinHash signature of its
+normalised word shingles. The signatures are built once, ahead of time, and
+stored in ``derelict/data`` together with the SPDX ids and names, so at run
+time the index is loaded once per process and matching a text is one
+vectorised comparison against every signature rather than a diff against
+every license text.
+
+Rebuild the index from a directory of SPDX license texts named
+``<SPDX-ID>.txt`` (the ``text/`` folder of spdx/license-list-data) with:
+
+    python -m derelict.licenses --build path/to/text --names path/to/licenses.json
+"""
+import argparse
+import functools
+import json
+import re
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+INDEX_PATH = DATA_DIR / "spdx_index.json"
+SIGNATURES_PATH = DATA_DIR / "spdx_signatures.npy"
+
+SHINGLE_SIZE = 3
+NUM_PERM = 256
+_PRIME = (1 << 31) - 1
+
+# Ignored when normalising, following the SPDX matching guidelines: copyright
+# notices, the "all rights reserved" boilerplate and spelling variants.
+_COPYRIGHT_LINE = re.compile(r"^\s*(copyright|\(c\)|©).*$", re.IGNORECASE | re.MULTILINE)
+_VARIANTS = {"licence": "license", "licences": "licenses", "licenced": "licensed"}
+
+
+def normalise(text):
+    text = _COPYRIGHT_LINE.sub(" ", text)
+    text = text.lower().replace("all rights reserved", " ")
+    words = re.findall(r"[a-z0-9]+", text)
+    return [_VARIANTS.get(word, word) for word in words]
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    words = normalise(text)
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _permutations(num_perm=NUM_PERM, seed=1):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def signature(text, permutations):
+    a, b = permutations
+    hashed = np.fromiter((zlib.crc32(s.encode()) & _PRIME for s in shingles(text)), dtype=np.uint64)
+    if hashed.size == 0:
+        return np.full(a.size, _PRIME, dtype=np.uint32)
+    # (a * x + b) mod p for every shingle and permutation; all values are
+    # below 2**31 so the products fit in uint64.
+    return ((np.outer(hashed, a) + b) % _PRIME).min(axis=0).astype(np.uint32)
+
+
+class LicenseIndex:
+    def __init__(self, ids, names, signatures, seed):
+        self.ids = ids
+        self.names = names
+        self.signatures = signatures
+        self.permutations = _permutations(signatures.shape[1], seed)
+
+    def match(self, text, top=5):
+        """Best matching SPDX licenses for ``text``, most similar first.
+
+        Returns a list of ``{"id", "name", "similarity"}`` dicts, where the
+        similarity is the estimated Jaccard similarity (0 to 1) of the shingles.
+        """
+        query = signature(text, self.permutations)
+        similarity = (self.signatures == query).mean(axis=1)
+        best = np.argsort(-similarity, kind="stable")[:top]
+        return [{"id": self.ids[i], "name": self.names[i], "similarity": float(similarity[i])} for i in best]
+
+
+@functools.lru_cache(maxsize=None)
+def load_index():
+    """The bundled index, loaded once and shared by every session."""
+    meta = json.loads(INDEX_PATH.read_text(encoding="utf-8"))
+    signatures = np.load(SIGNATURES_PATH)
+    return LicenseIndex(meta["ids"], meta["names"], signatures, meta["seed"])
+
+
+def identify(text, top=5):
+    return load_index().match(text, top=top)
+
+
+def build_index(text_dir, names_path=None, seed=1):
+    names = {}
+    deprecated = set()
+    if names_path is not None:
+        for entry in json.loads(Path(names_path).read_text(encoding="utf-8"))["licenses"]:
+            names[entry["licenseId"]] = entry["name"]
+            if entry.get("isDeprecatedLicenseId"):
+                deprecated.add(entry["licenseId"])
+
+    permutations = _permutations(NUM_PERM, seed)
+    ids, signatures = [], []
+    for path in sorted(Path(text_dir).glob("*.txt")):
+        spdx_id = path.stem
+        if spdx_id in deprecated or spdx_id.startswith("deprecated_"):
+            continue
+        ids.append(spdx_id)
+        signatures.append(signature(path.read_text(encoding="utf-8", errors="replace"), permutations))
+
+    DATA_DIR.mkdir(exist_ok=True)
+    np.save(SIGNATURES_PATH, np.vstack(signatures))
+    INDEX_PATH.write_text(json.dumps({
+        "seed": seed,
+        "ids": ids,
+        "names": [names.get(spdx_id, spdx_id) for spdx_id in ids],
+    }, indent=0), encoding="utf-8")
+    return len(ids)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Identify a license file, or rebuild the bundled SPDX index.")
+    parser.add_argument("file", nargs="?", help="license file to identify")
+    parser.add_argument("--build", metavar="TEXT_DIR", help="rebuild the index from a directory of <SPDX-ID>.txt files")
+    parser.add_argument("--names", metavar="LICENSES_JSON", help="SPDX licenses.json to take license names from")
+    args = parser.parse_args(argv)
+
+    if args.build:
+        count = build_index(args.build, args.names)
+        print(f"indexed {count} licenses into {INDEX_PATH.parent}")
+        return 0
+    if not args.file:
+        parser.error("give a license file to identify, or --build")
+    for match in identify(Path(args.file).read_text(encoding="utf-8", errors="replace")):
+        print(f"{match['similarity']:6.1%}  {match['id']:<24} {match['name']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""Check the external links in the guide.
+
+Every URL in the rendered guide, in every tab and popover and including text
+built at run time such as the survey captions, is requested concurrently with asyncio, with at most ``--per-host`` requests to
+one host at a time and at least ``--interval`` seconds between starting them,
+so no single site gets hammered. Results are kept in an on-disk cache for
+``--ttl`` hours, so repeated runs only re-check links that are due:
+
+    python -m derelict.links
+    python -m derelict.links --no-cache --per-host 1
+
+Network errors (timeouts, DNS failures) are never cached, so they are retried
+on the next run. Exits with 1 if any link is broken. ``benchmarks/links.py``
+runs the checker offline against a local stub server.
+"""
+import argparse
+import asyncio
+import contextlib
+import http.client
+import json
+import os
+import re
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+# Bump when what is stored per link changes, so older cached results are dropped.
+CACHE_VERSION = 1
+
+DEFAULT_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "derelict", "links.json")
+DEFAULT_TTL = 24 * 60 * 60
+
+# Some sites refuse requests without a browser-like user agent.
+USER_AGENT = "Mozilla/5.0 (compatible; derelict-link-checker)"
+
+_URL = re.compile(r"https?://[^\s\"'<>()\[\]{}`]+")
+
+# Elements whose markdown can hold links.
+TEXT_ELEMENTS = {"title", "header", "subheader", "markdown", "caption", "info", "success", "warning", "error"}
+
+
+def _texts(node):
+    if getattr(node, "type", None) in TEXT_ELEMENTS:
+        yield node.value
+    for child in getattr(node, "children", {}).values():
+        yield from _texts(child)
+
+
+def extract_urls():
+    """The distinct ``http(s)`` URLs in the rendered guide, in the order they first appear."""
+    from derelict.export import render_app
+    from derelict.sections import SECTIONS
+
+    urls = {}
+    # Each tab is only rendered when it is open, so render the app once per tab.
+    for section in SECTIONS:
+        for text in _texts(render_app(section["slug"])):
+            for url in _URL.findall(text):
+                urls.setdefault(url.rstrip(".,;:!?*"), None)
+    return list(urls)
+
+
+def load_cache(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache.get("links", {})
+
+
+def save_cache(path, links):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "links": links}, f)
+    os.replace(tmp, path)
+
+
+class HostLimiter:
+    """Limits concurrent requests per host and spaces out their starts."""
+
+    def __init__(self, per_host=2, interval=0.5):
+        self.per_host = per_host
+        self.interval = interval
+        self._semaphores = {}
+        self._locks = {}
+        self._next_start = {}
+
+    @contextlib.asynccontextmanager
+    async def slot(self, host):
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with semaphore:
+            async with self._locks.setdefault(host, asyncio.Lock()):
+                loop = asyncio.get_running_loop()
+                wait = self._next_start.get(host, 0) - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._next_start[host] = loop.time() + self.interval
+            yield
+
+
+def _open(url, method, timeout):
+    request = urllib.request.Request(url, method=method, headers={"User-Agent": USER_AGENT})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.url
+    except urllib.error.HTTPError as error:
+        return error.code, error.url
+
+
+def request_status(url, timeout=10):
+    """``{"status", "final_url", "error"}`` for ``url``: a HEAD request, or GET if HEAD isn't allowed."""
+    try:
+        status, final_url = _open(url, "HEAD", timeout)
+        if status in (403, 405, 501):
+            status, final_url = _open(url, "GET", timeout)
+    except (urllib.error.URLError, OSError, ValueError) as error:
+        reason = getattr(error, "reason", error)
+        return {"status": None, "final_url": None, "error": str(reason)}
+    except http.client.HTTPException as error:
+        # e.g. BadStatusLine from a server that answers with something other than HTTP.
+        return {"status": None, "final_url": None, "error": repr(error)}
+    return {"status": status, "final_url": final_url if final_url != url else None, "error": None}
+
+
+async def _check(url, limiter, executor, timeout):
+    async with limiter.slot(urlsplit(url).netloc.lower()):
+        start = time.perf_counter()
+        result = await asyncio.get_running_loop().run_in_executor(executor, request_status, url, timeout)
+    status = result["status"]
+    return {"url": url, **result, "ok": status is not None and status < 400,
+            "seconds": round(time.perf_counter() - start, 3), "checked": time.time()}
+
+
+async def _check_all(urls, jobs, per_host, interval, timeout):
+    limiter = HostLimiter(per_host, interval)
+    # urllib blocks, so each request runs in a worker thread; asyncio only schedules them.
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return await asyncio.gather(*(_check(url, limiter, executor, timeout) for url in urls))
+
+
+def check_links(urls, cache_path=DEFAULT_CACHE, ttl=DEFAULT_TTL, jobs=16, per_host=2, interval=0.5, timeout=10):
+    """Check ``urls`` and return one result per URL, in order, each with a ``cached`` flag.
+
+    Results younger than ``ttl`` seconds are taken from ``cache_path`` (``None``
+    for no cache) instead of being requested again.
+    """
+    cache = load_cache(cache_path) if cache_path else {}
+    now = time.time()
+    due = [url for url in urls if url not in cache or now - cache[url]["checked"] > ttl]
+    checked = {result["url"]: result for result in asyncio.run(_check_all(due, jobs, per_host, interval, timeout))} if due else {}
+
+    if cache_path and checked:
+        cache.update({url: result for url, result in checked.items() if result["status"] is not None})
+        save_cache(cache_path, cache)
+    return [{**checked[url], "cached": False} if url in checked else {**cache[url], "cached": True} for url in urls]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the external links in the guide.")
+    parser.add_argument("urls", nargs="*", help="URLs to check instead of the ones in the guide")
+    parser.add_argument("--jobs", type=int, default=16, help="requests in flight at once (default: 16)")
+    parser.add_argument("--per-host", type=int, default=2, help="requests in flight to one host at once (default: 2)")
+    parser.add_argument("--interval", type=float, default=0.5,
+                        help="seconds between starting requests to the same host (default: 0.5)")
+    parser.add_argument("--timeout", type=float, default=10, help="seconds to wait for each response (default: 10)")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL / 3600,
+                        help="hours before a cached result is checked again (default: 24)")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help=f"results cache file (default: {DEFAULT_CACHE})")
+    parser.add_argument("--no-cache", action="store_true", help="check every link, ignoring and not updating the cache")
+    parser.add_argument("--json", action="store_true", help="print one JSON line per link")
+    args = parser.parse_args(argv)
+
+    urls = args.urls or extract_urls()
+    results = check_links(urls, None if args.no_cache else args.cache, args.ttl * 3600,
+                          args.jobs, args.per_host, args.interval, args.timeout)
+    for result in results:
+        if args.json:
+            print(json.dumps(result))
+            continue
+        status = result["status"] or result["error"]
+        note = f" -> {result['final_url']}" if result["final_url"] else ""
+        print(f"{'ok' if result['ok'] else 'BROKEN':>6}  {status}  {result['url']}{note}{' (cached)' if result['cached'] else ''}")
+    broken = sum(not result["ok"] for result in results)
+    if broken and not args.json:
+        print(f"{broken} of {len(results)} links are broken", file=sys.stderr)
+    return 1 if broken else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
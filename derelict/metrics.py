@@ -0,0 +1,150 @@
+"""In-process metrics for the running app.
+
+Every script run of ``app.py`` records how long it took and which tab was
+open, each tab render and chart build is timed, and opening a TL;DR popover
+is counted. Recording is a dict update under a lock, aggregated in the
+process, so it is cheap enough to leave on.
+
+The totals are written in the Prometheus text format to the file named by the
+``DERELICT_METRICS_FILE`` environment variable, at most every
+``DERELICT_METRICS_INTERVAL`` seconds (15 by default), e.g. into the directory
+read by node_exporter's textfile collector:
+
+    DERELICT_METRICS_FILE=/var/lib/node_exporter/derelict.prom streamlit run app.py
+
+Memory held by each session's state is already reported by Streamlit itself,
+as ``cache_memory_bytes{cache_type="st_session_state"}`` at ``/_stcore/metrics``.
+"""
+import bisect
+import contextlib
+import os
+import threading
+import time
+
+METRICS_FILE = os.environ.get("DERELICT_METRICS_FILE")
+WRITE_INTERVAL = float(os.environ.get("DERELICT_METRICS_INTERVAL", 15))
+
+# Upper bounds, in seconds, of the histogram buckets for every timing.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Name: (type, help) of every metric the app records.
+METRICS = {
+    "derelict_sessions_total": ("counter", "Sessions started."),
+    "derelict_script_runs_total": ("counter", "Script runs of app.py, by open tab."),
+    "derelict_popover_opens_total": ("counter", "TL;DR popovers opened, by tab."),
+    "derelict_script_run_seconds": ("histogram", "Time taken by a script run of app.py, by open tab."),
+    "derelict_section_render_seconds": ("histogram", "Time taken to render a tab."),
+    "derelict_chart_build_seconds": ("histogram", "Time taken to build a chart that wasn't cached yet."),
+    "derelict_process_resident_memory_bytes": ("gauge", "Resident memory of the app's process."),
+}
+
+
+def _labels(labels):
+    return ",".join(f'{name}="{value}"' for name, value in labels)
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}  # (name, labels) -> number, or [bucket counts, sum, count] for histograms
+        self._written = 0.0
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._values[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        bucket = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            histogram = self._values.get(key)
+            if histogram is None:
+                histogram = self._values[key] = [[0] * (len(BUCKETS) + 1), 0.0, 0]
+            histogram[0][bucket] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    def render(self):
+        """Every metric in the Prometheus text exposition format."""
+        with self._lock:
+            values = sorted((key, [list(value[0]), *value[1:]] if isinstance(value, list) else value)
+                            for key, value in self._values.items())
+        lines = []
+        for name, (kind, description) in METRICS.items():
+            samples = [(labels, value) for (metric, labels), value in values if metric == name]
+            if not samples:
+                continue
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                if kind != "histogram":
+                    lines.append(f"{name}{{{_labels(labels)}}} {value}" if labels else f"{name} {value}")
+                    continue
+                buckets, total, count = value
+                cumulative = 0
+                for bound, hits in zip([*BUCKETS, "+Inf"], buckets):
+                    cumulative += hits
+                    lines.append(f"{name}_bucket{{{_labels([*labels, ('le', bound)])}}} {cumulative}")
+                lines.append(f"{name}_sum{{{_labels(labels)}}} {total:.6f}")
+                lines.append(f"{name}_count{{{_labels(labels)}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+    def flush(self, path=METRICS_FILE, interval=WRITE_INTERVAL):
+        """Write the metrics to ``path`` if it's set and they weren't written in the last ``interval`` seconds."""
+        if not path:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._written < interval:
+                return
+            self._written = now
+        self.set("derelict_process_resident_memory_bytes", resident_memory())
+        self.write(path)
+
+
+def resident_memory():
+    """The process's resident memory in bytes (its peak where the current value isn't available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+REGISTRY = Registry()
+
+
+def count(name, **labels):
+    REGISTRY.inc(name, **labels)
+
+
+def observe(name, seconds, **labels):
+    REGISTRY.observe(name, seconds, **labels)
+
+
+@contextlib.contextmanager
+def timed(name, **labels):
+    """Record how long the ``with`` block took in the histogram ``name``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.observe(name, time.perf_counter() - start, **labels)
+
+
+def flush():
+    REGISTRY.flush()
@@ -0,0 +1,207 @@
+"""Full-text search over the guide.
+
+The guide's text is pulled out of the rendered app (the same headless
+``AppTest`` render the static export uses) into passages, one per heading, and
+stored with an inverted index in ``derelict/data/search_index.json``. The index
+is rebuilt whenever the guide changes:
+
+    python -m derelict.search --build
+    python -m derelict.search --check
+
+The app loads the index once per process and every session shares it, so a
+search only looks up the query's terms in the index, scoring passages with
+BM25, and never scans the guide's text. The last word of the query also
+matches as a prefix, so results appear while a word is still being typed.
+"""
+import argparse
+import bisect
+import functools
+import json
+import math
+import re
+import sys
+from pathlib import Path
+
+INDEX_PATH = Path(__file__).resolve().parent / "data" / "search_index.json"
+
+# BM25 parameters, the usual defaults.
+K1 = 1.2
+B = 0.75
+
+# Prefix matching of the last query word stops after this many terms, so a
+# single letter doesn't expand to most of the vocabulary.
+MAX_PREFIX_TERMS = 50
+
+STOPWORDS = {"a", "an", "and", "are", "as", "at", "be", "by", "can", "for", "from", "has", "have", "if", "in", "is",
+             "it", "its", "of", "on", "or", "so", "that", "the", "this", "to", "was", "which", "will", "with", "you",
+             "your"}
+
+_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_MARKUP = re.compile(r"[*_`#>]+")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def plain_text(text):
+    """Markdown as plain text: links become their text, emphasis and code marks are dropped."""
+    return re.sub(r"\s+", " ", _MARKUP.sub("", _LINK.sub(r"\1", text))).strip()
+
+
+def terms(text):
+    return [word for word in _WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+# -- Building the index ------------------------------------------------------
+
+def _passages(node, section, passages, heading=None, in_popover=False):
+    kind = getattr(node, "type", None)
+    if kind in ("header", "subheader") and not in_popover:
+        from derelict.export import anchor_for
+        heading = {"section": section["slug"], "heading": plain_text(node.value), "anchor": anchor_for(node.value),
+                   "text": []}
+        passages.append(heading)
+    elif kind in ("header", "subheader", "markdown", "caption"):
+        if heading is None:
+            heading = {"section": section["slug"], "heading": section["label"].replace("*", "").strip(),
+                       "anchor": None, "text": []}
+            passages.append(heading)
+        heading["text"].append(plain_text(node.value))
+    else:
+        for child in getattr(node, "children", {}).values():
+            heading = _passages(child, section, passages, heading, in_popover or kind == "popover")
+    return heading
+
+
+def extract_passages():
+    """Every guide section's text as passages: ``{"section", "heading", "anchor", "text"}``."""
+    from derelict.export import open_tab, render_app
+    from derelict.sections import SECTIONS
+
+    passages = []
+    for section in SECTIONS:
+        if section.get("interactive"):
+            continue
+        _passages(open_tab(render_app(section["slug"])), section, passages)
+    for passage in passages:
+        passage["text"] = " ".join(passage["text"])
+    return passages
+
+
+def build_index(passages):
+    """The passages and an inverted index from term to ``[[passage, count], ...]``."""
+    postings = {}
+    lengths = []
+    for position, passage in enumerate(passages):
+        words = terms(passage["heading"]) * 2 + terms(passage["text"])  # a match in the heading counts double
+        lengths.append(len(words))
+        counts = {}
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+        for word, count in counts.items():
+            postings.setdefault(word, []).append([position, count])
+    return {"passages": passages, "lengths": lengths, "postings": dict(sorted(postings.items()))}
+
+
+# -- Searching ---------------------------------------------------------------
+
+class SearchIndex:
+    def __init__(self, index):
+        self.passages = index["passages"]
+        self.lengths = index["lengths"]
+        self.postings = index["postings"]
+        self.vocabulary = sorted(self.postings)
+        self.average_length = sum(self.lengths) / max(len(self.lengths), 1)
+
+    def expand(self, prefix):
+        """Indexed terms starting with ``prefix``, shortest first."""
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        matches = []
+        for term in self.vocabulary[start:]:
+            if not term.startswith(prefix) or len(matches) == MAX_PREFIX_TERMS:
+                break
+            matches.append(term)
+        return sorted(matches, key=len)
+
+    def search(self, query, limit=10):
+        """The best matching passages for ``query``, as ``(score, passage)`` pairs, best first."""
+        words = terms(query)
+        if not words:
+            return []
+        # Each query word is a group of alternative terms; the last one may be unfinished.
+        groups = [[word] for word in words[:-1]] + [self.expand(words[-1]) or [words[-1]]]
+        scores = {}
+        for group in groups:
+            # A passage scores for a group by its best-matching term, so a short
+            # prefix that expands to many terms doesn't count several times over.
+            group_scores = {}
+            for term in group:
+                postings = self.postings.get(term, ())
+                if not postings:
+                    continue
+                idf = math.log(1 + (len(self.passages) - len(postings) + 0.5) / (len(postings) + 0.5))
+                for position, count in postings:
+                    norm = K1 * (1 - B + B * self.lengths[position] / self.average_length)
+                    score = idf * count * (K1 + 1) / (count + norm)
+                    group_scores[position] = max(group_scores.get(position, 0), score)
+            for position, score in group_scores.items():
+                scores[position] = scores.get(position, 0) + score
+        best = sorted(scores.items(), key=lambda item: -item[1])[:limit]
+        return [(score, self.passages[position]) for position, score in best]
+
+
+@functools.lru_cache(maxsize=None)
+def load_index():
+    with open(INDEX_PATH, encoding="utf-8") as f:
+        return SearchIndex(json.load(f))
+
+
+def search(query, limit=10):
+    return load_index().search(query, limit)
+
+
+def snippet(passage, query, width=160):
+    """A stretch of the passage's text around the first query word found in it."""
+    text = passage["text"]
+    lowered = text.lower()
+    found = [lowered.find(word) for word in terms(query)]
+    start = min((position for position in found if position >= 0), default=0)
+    start = max(0, start - width // 4)
+    if start:
+        start = text.find(" ", start) + 1 or start
+    end = start + width
+    return ("..." if start else "") + text[start:end].strip() + ("..." if end < len(text) else "")
+
+
+def _serialise(index):
+    return json.dumps(index, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the guide's search index, or search it.")
+    parser.add_argument("query", nargs="?", help="search the index")
+    parser.add_argument("--build", action="store_true", help=f"rebuild {INDEX_PATH.name} from the app")
+    parser.add_argument("--check", action="store_true", help="fail if the index is out of date with the app")
+    args = parser.parse_args(argv)
+
+    if args.build or args.check:
+        index = _serialise(build_index(extract_passages()))
+        if args.check:
+            if not INDEX_PATH.exists() or INDEX_PATH.read_text(encoding="utf-8") != index:
+                print(f"{INDEX_PATH} is out of date with the app, re-run `python -m derelict.search --build`",
+                      file=sys.stderr)
+                return 1
+            print(f"{INDEX_PATH} matches the app")
+            return 0
+        INDEX_PATH.write_text(index, encoding="utf-8")
+        print(f"wrote {INDEX_PATH}")
+        return 0
+    if not args.query:
+        parser.error("give a query to search for, or --build/--check")
+
+    for score, passage in search(args.query):
+        anchor = f"#{passage['anchor']}" if passage["anchor"] else ""
+        print(f"{score:6.2f}  ?section={passage['section']}{anchor}  {passage['heading']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""Survey data behind the charts in the guide.
+
+The percentages published with the JetBrains and StackOverflow 2022 surveys
+are built in, with what's needed to credit each survey under its chart. More years, and a breakdown by respondent group, come from the
+raw public survey responses: ``ingest`` reads a raw CSV in chunks, keeping only
+the question and group columns, and writes per-question answer counts to a
+small Parquet file in ``derelict/data/surveys``. The app only ever loads those
+aggregates, once per process.
+
+    python -m derelict.surveys survey_results_public.csv --question vc_tools --year 2022 \\
+        --source StackOverflow --column VersionControlSystem --group-column MainBranch \\
+        --rename "I don't use one=None"
+
+Multiple-answer questions are stored in one column separated by ``--separator``
+(";" in the StackOverflow dumps), so percentages can add up to more than 100.
+"""
+import argparse
+import functools
+import sys
+from pathlib import Path
+
+SURVEY_DIR = Path(__file__).resolve().parent / "data" / "surveys"
+
+ALL_RESPONDENTS = "All"
+
+# Published percentages, used when no aggregated raw data has been ingested for
+# that question and year.
+PUBLISHED = {
+    # https://lp.jetbrains.com/python-developers-survey-2022/
+    # Copyright © JetBrains s.r.o. 2023
+    # cc-by-4.0
+    "where_dependencies": {
+        "source": "JetBrains",
+        "year": 2022,
+        "url": "https://lp.jetbrains.com/python-developers-survey-{year}/",
+        "percentages": {
+            "requirements.txt" : 69,
+            "pyproject.toml": 33,
+            "poetry.lock": 25,
+            "pipfile.lock": 15,
+            "Conda environment.yml": 11,
+            "pip constraints.txt": 6,
+            "Other": 4,
+            "None": 4,
+        },
+    },
+    "tools_for_dependencies": {
+        "source": "JetBrains",
+        "year": 2022,
+        "url": "https://lp.jetbrains.com/python-developers-survey-{year}/",
+        "percentages": {
+            "poetry": 30,
+            "pipenv": 28,
+            "pip-tools": 26,
+            "Other" : 4,
+            "None": 28,
+        },
+    },
+    # https://survey.stackoverflow.co/2022/#section-version-control-version-control-systems
+    "vc_tools": {
+        "source": "StackOverflow",
+        "year": 2022,
+        "url": "https://survey.stackoverflow.co/{year}/#section-version-control-version-control-systems",
+        "percentages": {
+            "git": 93.87,
+            "SVN": 5.18,
+            "None": 4.31,
+            "Mercurial" : 1.13,
+        },
+    },
+}
+
+
+# How to credit each source under its charts. JetBrains publish, and hold the
+# copyright to, a year's results in the following year.
+SOURCES = {
+    "JetBrains": {"survey": "Python Developers Survey", "copyright": "JetBrains s.r.o.", "published_after": 1},
+    "StackOverflow": {"survey": "Developer Survey", "copyright": "StackOverflow", "published_after": 0},
+}
+
+
+def aggregate_csv(path, column, group_column=None, separator=";", rename=None, chunksize=100_000):
+    """Count the answers to ``column`` of a raw survey CSV, per respondent group.
+
+    Only ``column`` and ``group_column`` are parsed, ``chunksize`` rows at a
+    time, so memory use doesn't grow with the size of the file. Returns a
+    dataframe with ``group``, ``answer``, ``count`` and ``respondents`` columns,
+    including an ``"All"`` group.
+    """
+    import pandas as pd
+
+    usecols = [column] if group_column is None else [column, group_column]
+    counts = []
+    respondents = []
+    for chunk in pd.read_csv(path, usecols=usecols, dtype="string", chunksize=chunksize):
+        chunk = chunk.dropna(subset=[column])
+        groups = chunk[group_column].fillna("Not answered") if group_column else pd.Series(ALL_RESPONDENTS, index=chunk.index)
+        answers = pd.DataFrame({"group": groups, "answer": chunk[column].str.split(separator)}).explode("answer")
+        answers["answer"] = answers["answer"].str.strip()
+        counts.append(answers.groupby(["group", "answer"]).size())
+        respondents.append(groups.value_counts())
+
+    if not counts:
+        return pd.DataFrame(columns=["group", "answer", "count", "respondents"])
+    count = pd.concat(counts).groupby(level=[0, 1]).sum().rename("count").reset_index()
+    total = pd.concat(respondents).groupby(level=0).sum().rename("respondents")
+    count = count.join(total, on="group")
+    if rename:
+        count["answer"] = count["answer"].replace(rename)
+        count = count.groupby(["group", "answer"], as_index=False).agg(count=("count", "sum"), respondents=("respondents", "first"))
+
+    if group_column is not None:
+        everyone = count.groupby("answer", as_index=False)["count"].sum()
+        everyone["group"] = ALL_RESPONDENTS
+        everyone["respondents"] = int(total.sum())
+        count = pd.concat([count, everyone], ignore_index=True)
+    return count[["group", "answer", "count", "respondents"]]
+
+
+def ingest(path, question, year, source, column, **options):
+    """Aggregate a raw survey CSV and store it as ``question``'s data for ``year``."""
+    import pandas as pd
+
+    counts = aggregate_csv(path, column, **options)
+    counts.insert(0, "year", year)
+    counts.insert(0, "source", source)
+
+    SURVEY_DIR.mkdir(parents=True, exist_ok=True)
+    target = SURVEY_DIR / f"{question}.parquet"
+    if target.exists():
+        existing = pd.read_parquet(target)
+        counts = pd.concat([existing[existing["year"] != year], counts], ignore_index=True)
+    counts = counts.astype({"year": "int32", "count": "int64", "respondents": "int64"})
+    counts.sort_values(["year", "group", "answer"]).to_parquet(target, index=False)
+    load_aggregates.cache_clear()
+    return target
+
+
+@functools.lru_cache(maxsize=None)
+def load_aggregates(question):
+    """The ingested answer counts for ``question``, or ``None`` if there are none."""
+    path = SURVEY_DIR / f"{question}.parquet"
+    if not path.exists():
+        return None
+    import pandas as pd
+    return pd.read_parquet(path)
+
+
+def options(question):
+    """The years and respondent groups there is data for, newest year first."""
+    aggregates = load_aggregates(question)
+    years = {PUBLISHED[question]["year"]} if question in PUBLISHED else set()
+    groups = {ALL_RESPONDENTS}
+    if aggregates is not None:
+        years.update(int(year) for year in aggregates["year"].unique())
+        groups.update(aggregates["group"].unique())
+    return sorted(years, reverse=True), [ALL_RESPONDENTS] + sorted(groups - {ALL_RESPONDENTS})
+
+
+def percentages(question, year=None, group=ALL_RESPONDENTS):
+    """``{answer: percentage of respondents}`` for one year and respondent group."""
+    if year is None:
+        year = options(question)[0][0]
+    aggregates = load_aggregates(question)
+    if aggregates is not None:
+        rows = aggregates[(aggregates["year"] == year) & (aggregates["group"] == group)]
+        if len(rows):
+            return dict(zip(rows["answer"], (100 * rows["count"] / rows["respondents"]).round(2)))
+    published = PUBLISHED.get(question)
+    if published is not None and published["year"] == year and group == ALL_RESPONDENTS:
+        return dict(published["percentages"])
+    return {}
+
+
+def source(question, year):
+    """Who ran the survey that ``question``'s data for ``year`` comes from."""
+    aggregates = load_aggregates(question)
+    if aggregates is not None:
+        sources = aggregates.loc[aggregates["year"] == year, "source"]
+        if len(sources):
+            return sources.iloc[0]
+    return PUBLISHED[question]["source"] if question in PUBLISHED else None
+
+
+def survey_name(question, year):
+    """The survey's name and year, linked to its results where the link is known, e.g. for a caption."""
+    publisher = source(question, year)
+    name = f"{publisher} {SOURCES.get(publisher, {}).get('survey', 'survey')} {year}"
+    url = PUBLISHED.get(question, {}).get("url")
+    if url is not None and publisher == PUBLISHED[question]["source"]:
+        name = f"[{name}]({url.format(year=year)})"
+    return name
+
+
+def attribution(question, year):
+    """Markdown crediting the survey behind ``question``'s chart for ``year``."""
+    publisher = source(question, year)
+    credit = SOURCES.get(publisher)
+    if credit is None:
+        return f"*Data from the {survey_name(question, year)}.*"
+    return (f"*Data from the {survey_name(question, year)}. "
+            f"Copyright © {credit['copyright']} {year + credit['published_after']}.*")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate a raw survey CSV into the app's survey data.")
+    parser.add_argument("csv", help="raw survey responses, e.g. survey_results_public.csv")
+    parser.add_argument("--question", required=True, help=f"chart to store the answers for, e.g. {', '.join(PUBLISHED)}")
+    parser.add_argument("--year", type=int, required=True, help="survey year")
+    parser.add_argument("--source", required=True, help="who ran the survey, e.g. StackOverflow")
+    parser.add_argument("--column", required=True, help="column holding the answers to the question")
+    parser.add_argument("--group-column", help="column to break the answers down by, e.g. MainBranch")
+    parser.add_argument("--separator", default=";", help="separator between answers of multiple-answer questions (default: ;)")
+    parser.add_argument("--rename", action="append", default=[], metavar="OLD=NEW",
+                        help="rename an answer, e.g. \"I don't use one=None\" (can be repeated)")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="rows read at a time (default: 100000)")
+    args = parser.parse_args(argv)
+
+    rename = dict(item.split("=", 1) for item in args.rename)
+    target = ingest(args.csv, args.question, args.year, args.source, args.column,
+                    group_column=args.group_column, separator=args.separator,
+                    rename=rename or None, chunksize=args.chunksize)
+    print(f"wrote {target}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
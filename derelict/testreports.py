@@ -0,0 +1,202 @@
+"""Analyse test reports: pytest JUnit XML (``--junitxml``) and ``--durations`` output.
+
+Reports from large suites on CI can be tens of MB, so neither format is read
+into memory whole. JUnit XML is parsed incrementally and each ``<testcase>`` is
+dropped from the tree as soon as it has been read, and ``--durations`` output is
+read a line at a time. Only the columns needed are kept (test, seconds,
+outcome) and the summaries are pandas groupbys over all runs at once.
+
+Test names from both formats are normalised to the JUnit form
+(``tests.test_io.TestRead.test_csv``) so the same test can be followed across
+runs whichever way it was reported.
+
+    python -m derelict.testreports run1.xml run2.xml durations.txt --top 10
+"""
+import argparse
+import io
+import re
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+PASSED = "passed"
+FAILED = "failed"
+ERROR = "error"
+SKIPPED = "skipped"
+# --durations output only lists timings, not whether the test passed.
+UNKNOWN = "unknown"
+
+OUTCOMES = [PASSED, FAILED, ERROR, SKIPPED, UNKNOWN]
+
+_DURATION = re.compile(r"^\s*(\d+(?:\.\d+)?)s\s+(setup|call|teardown)\s+(\S.*?)\s*$")
+
+
+def _tag(element):
+    return element.tag.rsplit("}", 1)[-1]
+
+
+def node_name(nodeid):
+    """``tests/test_io.py::TestRead::test_csv[a/b]`` -> ``tests.test_io.TestRead.test_csv[a/b]``."""
+    path, _, rest = nodeid.partition("::")
+    path = re.sub(r"\.py$", "", path).replace("/", ".").replace("\\", ".")
+    return ".".join([path] + rest.split("::")) if rest else path
+
+
+def read_junit(file):
+    """Yield ``(test, seconds, outcome)`` for every ``<testcase>`` in a JUnit XML file."""
+    stack = []
+    for event, element in ET.iterparse(file, events=("start", "end")):
+        if event == "start":
+            stack.append(element)
+            continue
+        stack.pop()
+        if _tag(element) != "testcase":
+            continue
+        outcome = PASSED
+        for child in element:
+            tag = _tag(child)
+            if tag == "failure":
+                outcome = FAILED
+            elif tag == ERROR:
+                outcome = ERROR
+            elif tag == SKIPPED:
+                outcome = SKIPPED
+        classname, name = element.get("classname"), element.get("name", "")
+        yield (f"{classname}.{name}" if classname else name), float(element.get("time") or 0), outcome
+        # Drop the finished testcase so the tree never holds more than one.
+        if stack:
+            stack[-1].remove(element)
+        element.clear()
+
+
+def read_durations(lines):
+    """Yield ``(test, seconds, outcome)`` for every timing in pytest ``--durations`` output.
+
+    The setup, call and teardown of a test are listed separately; they are
+    added up when the report is loaded.
+    """
+    for line in lines:
+        match = _DURATION.match(line)
+        if match:
+            yield node_name(match.group(3)), float(match.group(1)), UNKNOWN
+
+
+def _is_xml(file):
+    head = file.read(512)
+    file.seek(0)
+    if isinstance(head, bytes):
+        head = head.decode("utf-8", errors="replace")
+    return head.lstrip("\ufeff \t\r\n").startswith("<")
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def load_report(file, run, chunksize=50_000):
+    """One report as a dataframe with ``run``, ``test``, ``seconds`` and ``outcome`` columns.
+
+    ``file`` is a path or a binary file object, in either format. Rows are
+    collected ``chunksize`` at a time into compact columns.
+    """
+    import pandas as pd
+
+    if isinstance(file, (str, Path)):
+        with open(file, "rb") as f:
+            return load_report(f, run, chunksize)
+    text = None
+    if _is_xml(file):
+        rows = read_junit(file)
+    else:
+        text = io.TextIOWrapper(file, encoding="utf-8", errors="replace")
+        rows = read_durations(text)
+
+    frames = []
+    for chunk in _chunks(rows, chunksize):
+        tests, seconds, outcomes = zip(*chunk)
+        frames.append(pd.DataFrame({
+            "test": pd.Series(tests, dtype="string"),
+            "seconds": pd.Series(seconds, dtype="float64"),
+            "outcome": pd.Categorical(outcomes, categories=OUTCOMES),
+        }))
+    if text is not None:
+        text.detach()  # leave the caller's file open
+    if not frames:
+        frames.append(pd.DataFrame({"test": pd.Series(dtype="string"), "seconds": pd.Series(dtype="float64"),
+                                    "outcome": pd.Categorical([], categories=OUTCOMES)}))
+    report = pd.concat(frames, ignore_index=True)
+    if (report["outcome"] == UNKNOWN).all():
+        report = report.groupby("test", as_index=False, sort=False).agg(seconds=("seconds", "sum"), outcome=("outcome", "first"))
+    report.insert(0, "run", run)
+    return report
+
+
+def run_labels(names):
+    """A unique label per run: the file names, numbered if any of them repeat (e.g. several ``report.xml``)."""
+    if len(set(names)) == len(names):
+        return list(names)
+    return [f"{position}. {name}" for position, name in enumerate(names, 1)]
+
+
+def combine(reports):
+    """All runs in one dataframe, with ``run`` as a categorical in upload order."""
+    import pandas as pd
+
+    runs = pd.concat(reports, ignore_index=True)
+    runs["run"] = pd.Categorical(runs["run"], categories=list(dict.fromkeys(runs["run"])))
+    return runs
+
+
+def outcome_counts(runs):
+    """Tests per outcome, one row per run."""
+    return runs.groupby(["run", "outcome"], observed=False).size().unstack("outcome", fill_value=0)[OUTCOMES]
+
+
+def slowest(runs, top=10):
+    """The ``top`` slowest tests of each run."""
+    ranked = runs.sort_values("seconds", ascending=False)
+    return ranked.groupby("run", observed=True, sort=False).head(top).sort_values(["run", "seconds"], ascending=[True, False])
+
+
+def recurring_slow(runs, top=10, min_runs=2):
+    """Tests among the ``top`` slowest in at least ``min_runs`` runs, most often slow first."""
+    slow = slowest(runs, top)
+    summary = slow.groupby("test").agg(
+        runs=("run", "nunique"), mean_seconds=("seconds", "mean"), max_seconds=("seconds", "max"),
+    )
+    summary = summary[summary["runs"] >= min_runs]
+    return summary.sort_values(["runs", "mean_seconds"], ascending=False).reset_index()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise pytest JUnit XML reports and --durations output.")
+    parser.add_argument("reports", nargs="+", help="JUnit XML files or saved pytest --durations output, one per run")
+    parser.add_argument("--top", type=int, default=10, help="how many of the slowest tests to show per run (default: 10)")
+    parser.add_argument("--min-runs", type=int, default=2,
+                        help="how many runs a test must be among the slowest in to count as recurring (default: 2)")
+    args = parser.parse_args(argv)
+
+    labels = run_labels([Path(path).name for path in args.reports])
+    runs = combine([load_report(path, label) for path, label in zip(args.reports, labels)])
+    print(outcome_counts(runs).to_string())
+    for run, tests in slowest(runs, args.top).groupby("run", observed=True):
+        print(f"\nslowest in {run}:")
+        for row in tests.itertuples():
+            print(f"{row.seconds:>9.2f}s  {row.test}")
+    if len(args.reports) > 1:
+        recurring = recurring_slow(runs, args.top, args.min_runs)
+        print(f"\nslow in at least {args.min_runs} runs:")
+        for row in recurring.itertuples():
+            print(f"{row.runs:>3} runs  {row.mean_seconds:>9.2f}s mean  {row.test}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())